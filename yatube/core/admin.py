@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    """Класс кастомизации модели Task"""
+
+    list_display = (
+        'pk', 'name', 'status', 'attempts', 'run_after', 'created',
+    )
+    list_filter = ('status', 'name',)
+    readonly_fields = ('last_error',)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Класс кастомизации модели OutgoingEmail"""
+
+    list_display = (
+        'pk', 'subject', 'recipients', 'status', 'attempts', 'run_after',
+    )
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients',)
+    exclude = ('message',)
+    readonly_fields = ('last_error',)
+
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas, install_slow_query_log
+
+        connection_created.connect(apply_sqlite_pragmas)
+        connection_created.connect(install_slow_query_log)
+        # Регистрирует фоновые задачи приложений для run_tasks.
+        autodiscover_modules('tasks')
+
+        if settings.TEMPLATE_WARMUP:
+            from .template_backend import warm_templates
+
+            warm_templates()
@@ -0,0 +1,114 @@
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from posts.models import AuthorStats, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    """Исключение для отката тестовых данных бенчмарка"""
+
+
+@contextmanager
+def rollback_after():
+    """Выполняет блок в транзакции и откатывает все изменения"""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+@contextmanager
+def isolated_cache():
+    """
+    Подменяет кэш по умолчанию пустым кэшем в отдельном каталоге или
+    области памяти: бенчмарк не очищает рабочий кэш и не оставляет в нем
+    данные откаченных публикаций
+    """
+    config = dict(settings.CACHES[DEFAULT_CACHE_ALIAS])
+    if not issubclass(import_string(config['BACKEND']), FileBasedCache):
+        config['BACKEND'] = 'core.cache_backends.InstrumentedLocMemCache'
+    with tempfile.TemporaryDirectory() as location:
+        config['LOCATION'] = location
+        with override_settings(CACHES={DEFAULT_CACHE_ALIAS: config}):
+            try:
+                yield
+            finally:
+                # Область LocMemCache остается в памяти процесса.
+                cache.clear()
+
+
+def seed_posts(posts, authors=100, groups=20, batch_size=5000):
+    """Создает авторов, группы и posts публикаций пачками"""
+    User.objects.bulk_create(
+        User(username=f'bench_author_{num}') for num in range(authors)
+    )
+    author_ids = list(User.objects.filter(
+        username__startswith='bench_author_'
+    ).values_list('pk', flat=True))
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {num}',
+            slug=f'bench-group-{num}',
+            description='Группа для бенчмарка',
+        )
+        for num in range(groups)
+    )
+    group_ids = list(Group.objects.filter(
+        slug__startswith='bench-group-'
+    ).values_list('pk', flat=True))
+
+    for start in range(0, posts, batch_size):
+        Post.objects.bulk_create(
+            Post(
+                text=f'Публикация {num}',
+                author_id=author_ids[num % len(author_ids)],
+                group_id=group_ids[num % len(group_ids)],
+            )
+            for num in range(start, min(start + batch_size, posts))
+        )
+    # bulk_create не вызывает сигналы: счетчики авторов заполняются явно.
+    AuthorStats.objects.reconcile(author_ids)
+    return author_ids, group_ids
+
+
+def seed_followers(author_id, followers, batch_size=5000):
+    """Создает followers пользователей, подписанных на автора"""
+    for start in range(0, followers, batch_size):
+        User.objects.bulk_create(
+            User(username=f'bench_follower_{num}')
+            for num in range(start, min(start + batch_size, followers))
+        )
+    follower_ids = list(User.objects.filter(
+        username__startswith='bench_follower_'
+    ).values_list('pk', flat=True))
+    for start in range(0, len(follower_ids), batch_size):
+        Follow.objects.bulk_create(
+            Follow(user_id=follower_id, author_id=author_id)
+            for follower_id in follower_ids[start:start + batch_size]
+        )
+    AuthorStats.objects.reconcile([author_id])
+    return follower_ids
+
+
+def measure(func, repeat):
+    """Вызывает func repeat раз и возвращает время вызовов в мс"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
@@ -0,0 +1,28 @@
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from core import perf
+
+
+class InstrumentedCacheMixin:
+    """
+    Учитывает попадания и промахи кэша в показателях запроса.
+    get_many() у этих бэкендов вызывает get() для каждого ключа.
+    """
+
+    def get(self, key, default=None, version=None):
+        sentinel = object()
+        value = super().get(key, sentinel, version)
+        if value is sentinel:
+            perf.record_cache(0, 1)
+            return default
+        perf.record_cache(1, 0)
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, FileBasedCache):
+    pass
@@ -0,0 +1,138 @@
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from core import perf
+
+
+logger = logging.getLogger('yatube.slow_queries')
+
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Нормализует SQL: литералы и списки IN заменяются заглушками,
+    чтобы однотипные запросы с разными значениями группировались вместе.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql).replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class SlowQueryLog:
+    """Медленные запросы, сгруппированные по отпечатку SQL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._local = threading.local()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        """Записи, отсортированные по суммарному времени"""
+        with self._lock:
+            entries = [dict(entry, views=sorted(entry['views']))
+                       for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: -entry['total_ms'])
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обертка выполнения запросов (connection.execute_wrapper)"""
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if (
+            threshold is not None
+            and duration >= threshold
+            and not getattr(self._local, 'explaining', False)
+        ):
+            self.record(sql, params, many, duration, context['connection'])
+        return result
+
+    def record(self, sql, params, many, duration, connection):
+        stats = perf.current()
+        view = getattr(stats, 'view', None) or '<no view>'
+        key = fingerprint(sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    'fingerprint': key,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'views': set(),
+                    'explain': None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + duration, 3)
+            entry['max_ms'] = round(max(entry['max_ms'], duration), 3)
+            entry['views'].add(view)
+            need_explain = entry['explain'] is None
+        if need_explain and not many:
+            plan = self.explain(sql, params, connection)
+            with self._lock:
+                entry['explain'] = plan
+        logger.warning(
+            'Медленный запрос %.1f мс в %s: %s\n%s',
+            duration, view, key, entry['explain'] or '',
+        )
+
+    def explain(self, sql, params, connection):
+        """План запроса; строится один раз на отпечаток"""
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return ''
+        prefix = {
+            'sqlite': 'EXPLAIN QUERY PLAN ',
+            'postgresql': 'EXPLAIN ',
+            'mysql': 'EXPLAIN ',
+        }.get(connection.vendor)
+        if prefix is None:
+            return ''
+        self._local.explaining = True
+        try:
+            # Точка сохранения защищает транзакцию PostgreSQL от
+            # прерывания, если EXPLAIN завершится ошибкой.
+            with transaction.atomic(using=connection.alias), \
+                    connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return '\n'.join(
+                    ' '.join(str(value) for value in row)
+                    for row in cursor.fetchall()
+                )
+        except Exception as error:
+            return f'EXPLAIN не выполнен: {error}'
+        finally:
+            self._local.explaining = False
+
+
+slow_query_log = SlowQueryLog()
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к новому соединению с SQLite"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            if not name.isidentifier():
+                raise ValueError(f'Некорректное имя PRAGMA: {name!r}')
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """Подключает журнал медленных запросов к соединению с БД"""
+    if slow_query_log not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_log)
@@ -0,0 +1,123 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+PRIMARY = 'default'
+
+# Модели, которые всегда читаются с основной базы: сессия и
+# пользователь должны быть видны сразу после входа.
+PRIMARY_ONLY_APPS = {'sessions', 'auth'}
+
+# Чтения с реплик разрешает только ReplicaPinningMiddleware: команды,
+# фоновые задачи и импорт читают с основной базы.
+_use_primary = ContextVar('use_primary', default=True)
+_lag_checks = {}
+
+
+def replica_aliases():
+    """Псевдонимы баз данных, настроенных как реплики"""
+    return list(settings.REPLICA_DATABASES)
+
+
+def _measure_lag(alias):
+    """Отставание реплики в секундах; None, если реплика недоступна"""
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            # Локальные реплики SQLite — копии файла без репликации.
+            connection.ensure_connection()
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COALESCE(EXTRACT(EPOCH FROM '
+                'now() - pg_last_xact_replay_timestamp()), 0)'
+            )
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        return None
+
+
+def replica_lag(alias):
+    """Отставание реплики с кэшированием на REPLICA_LAG_CHECK_INTERVAL"""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is None or now - checked[0] > (
+        settings.REPLICA_LAG_CHECK_INTERVAL
+    ):
+        checked = _lag_checks[alias] = (now, _measure_lag(alias))
+    return checked[1]
+
+
+def healthy_replicas():
+    """Доступные реплики с допустимым отставанием"""
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            healthy.append(alias)
+    return healthy
+
+
+def primary_pinned():
+    """
+    Читать ли с основной базы: вне запроса, в закрепленном контексте
+    и внутри транзакции, которая должна видеть свои же записи.
+    """
+    return _use_primary.get() or connections[PRIMARY].in_atomic_block
+
+
+def pin_primary(value=True):
+    """Направляет чтения текущего запроса на основную базу"""
+    return _use_primary.set(value)
+
+
+def unpin_primary(token):
+    _use_primary.reset(token)
+
+
+@contextmanager
+def primary():
+    """Контекст, в котором все чтения идут в основную базу"""
+    token = pin_primary()
+    try:
+        yield
+    finally:
+        unpin_primary(token)
+
+
+def use_primary(view_func):
+    """Декоратор для вью, которые пишут в базу и читают свои записи"""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with primary():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Чтения запросов распределяются по репликам с допустимым отставанием,
+    записи и чтения в закрепленном контексте идут в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if primary_pinned() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит с основной базы через репликацию.
+        return db not in replica_aliases()
@@ -0,0 +1,92 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .models import OutgoingEmail
+
+
+def dump_attachment(attachment):
+    """Вложение (имя, содержимое, тип) в виде словаря для JSON"""
+    if not isinstance(attachment, tuple):
+        raise ValueError(
+            'Письмо с вложением MIMEBase нельзя поставить в очередь'
+        )
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return {
+            'filename': filename,
+            'content': base64.b64encode(content).decode('ascii'),
+            'mimetype': mimetype,
+            'base64': True,
+        }
+    return {'filename': filename, 'content': content, 'mimetype': mimetype}
+
+
+def load_attachment(data):
+    content = data['content']
+    if data.get('base64'):
+        content = base64.b64decode(content)
+    return data['filename'], content, data['mimetype']
+
+
+def dump_message(message):
+    """Сериализует поля письма в JSON для хранения в очереди"""
+    return json.dumps({
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'content_subtype': message.content_subtype,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': [
+            dump_attachment(attachment)
+            for attachment in message.attachments
+        ],
+    }, ensure_ascii=False)
+
+
+def load_message(data):
+    """Собирает EmailMultiAlternatives из результата dump_message"""
+    fields = json.loads(data)
+    message = EmailMultiAlternatives(
+        subject=fields['subject'],
+        body=fields['body'],
+        from_email=fields['from_email'],
+        to=fields['to'],
+        cc=fields['cc'],
+        bcc=fields['bcc'],
+        reply_to=fields['reply_to'],
+        headers=fields['headers'],
+        alternatives=[tuple(item) for item in fields['alternatives']],
+        attachments=[load_attachment(item) for item in fields['attachments']],
+    )
+    message.content_subtype = fields['content_subtype']
+    return message
+
+
+class SpoolEmailBackend(BaseEmailBackend):
+    """
+    Кладет письма в очередь OutgoingEmail вместо отправки. Письма
+    доставляет команда send_spooled_mail через MAIL_SPOOL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        spooled = [
+            OutgoingEmail(
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+                message=dump_message(message),
+                max_attempts=settings.MAIL_SPOOL_MAX_ATTEMPTS,
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutgoingEmail.objects.bulk_create(spooled)
+        return len(spooled)
@@ -0,0 +1,133 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.perf import summarize
+from posts.models import Group, Post
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _fetch(url):
+    started = time.perf_counter()
+    try:
+        with urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status < 400
+    except (HTTPError, URLError, OSError):
+        ok = False
+    return (time.perf_counter() - started) * 1000, ok
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность сервера при разном числе '
+        'одновременных соединений. Сервер задается --base-url (например, '
+        'gunicorn с yatube.wsgi) или запускается через runserver с --serve: '
+        'тогда сравниваются варианты с разным VIEW_QUERY_WORKERS из '
+        '--workers (0 - запросы вью по очереди).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--serve', action='store_true',
+                            help='Запустить runserver на свободном порту')
+        parser.add_argument('--workers', type=int, nargs='+', default=[0, 4],
+                            help='Значения VIEW_QUERY_WORKERS для --serve')
+        parser.add_argument('--paths', nargs='+',
+                            help='По умолчанию лента группы и автора')
+        parser.add_argument('--concurrency', type=int, nargs='+',
+                            default=[1, 8, 32])
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Запросов на каждый уровень параллелизма')
+
+    def default_paths(self):
+        """
+        Ленты первой группы и автора: их вью выполняют запросы через
+        run_parallel. Посторонний параметр отключает кэш страниц для
+        анонимных читателей, иначе запросы вью не выполнялись бы.
+        """
+        paths = []
+        slug = Group.objects.order_by('pk').values_list(
+            'slug', flat=True
+        ).first()
+        if slug is not None:
+            paths.append(reverse('posts:group_list', kwargs={'slug': slug}))
+        username = Post.objects.order_by('pk').values_list(
+            'author__username', flat=True
+        ).first()
+        if username is not None:
+            paths.append(
+                reverse('posts:profile', kwargs={'username': username})
+            )
+        if not paths:
+            raise CommandError('Нет групп и публикаций, укажите --paths')
+        return [f'{path}?uncached=1' for path in paths]
+
+    def start_server(self, workers):
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+             'runserver', '--noreload', f'127.0.0.1:{port}'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env={**os.environ, 'VIEW_QUERY_WORKERS': str(workers)},
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('runserver завершился при запуске')
+            try:
+                with socket.create_connection(('127.0.0.1', port), 1):
+                    return server, base_url
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError('runserver не запустился за 30 секунд')
+
+    def run_level(self, url, concurrency, count):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(_fetch, [url] * count))
+        elapsed = time.perf_counter() - started
+        return {
+            **summarize([timing for timing, _ in results]),
+            'errors': sum(not ok for _, ok in results),
+            'rps': round(count / elapsed, 1),
+        }
+
+    def run_paths(self, base_url, options):
+        for path in options['paths']:
+            url = base_url + path
+            self.stdout.write(self.style.MIGRATE_HEADING(url))
+            for concurrency in options['concurrency']:
+                stats = self.run_level(url, concurrency, options['requests'])
+                self.stdout.write(f'  {concurrency:4} соединений: {stats}')
+
+    def handle(self, *args, **options):
+        if not options['paths']:
+            options['paths'] = self.default_paths()
+        if not options['serve']:
+            self.run_paths(options['base_url'].rstrip('/'), options)
+            return
+        for workers in options['workers']:
+            self.stdout.write(f'VIEW_QUERY_WORKERS={workers}')
+            server, base_url = self.start_server(workers)
+            try:
+                self.run_paths(base_url, options)
+            finally:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import measure, rollback_after, seed_posts
+from core.perf import summarize
+from core.utils import CURSOR_NEXT, encode_cursor, paginate
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время открытия страниц ленты разной глубины '
+        'при постраничном выводе через OFFSET и через курсор'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--pages', type=int, nargs='+',
+                            default=[1, 100, 1000])
+        parser.add_argument('--per-page', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        results = {}
+        with rollback_after():
+            self.stdout.write(f'Создаем {options["posts"]} публикаций...')
+            seed_posts(options['posts'])
+            queryset = Post.objects.all()
+            ordered = queryset.order_by('-pub_date', '-pk')
+
+            for page in options['pages']:
+                if page > 1:
+                    # Курсор на последнюю запись предыдущей страницы.
+                    anchor = ordered[(page - 1) * per_page - 1]
+                    cursor = encode_cursor(
+                        CURSOR_NEXT, anchor.pub_date, anchor.pk
+                    )
+                else:
+                    cursor = ''
+                results[page] = {
+                    'offset': measure(
+                        lambda: list(paginate(queryset, page, per_page)),
+                        options['repeat'],
+                    ),
+                    'cursor': measure(
+                        lambda: list(paginate(
+                            queryset, None, per_page, cursor=cursor
+                        )),
+                        options['repeat'],
+                    ),
+                }
+        for page, modes in results.items():
+            for mode, timings in modes.items():
+                self.stdout.write(
+                    f'страница {page}, {mode}: {summarize(timings)} мс'
+                )
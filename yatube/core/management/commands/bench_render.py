@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory
+
+from core.benchmarks import measure, rollback_after, seed_posts
+from core.perf import summarize
+from core.utils import paginate
+from posts.models import Post
+from posts.presenters import FeedPage
+
+# Цикл ленты в прежнем виде: три разворота URL на каждую публикацию.
+REVERSE_TEMPLATE = '''
+{% for post in page_obj %}
+  {{ post.author.get_full_name }}
+  <a href="{% url 'posts:profile' post.author.username %}"></a>
+  {{ post.pub_date|date:"d E Y" }} {{ post.text }}
+  <a href="{% url 'posts:post_detail' post.pk %}"></a>
+  {% if post.group %}
+    <a href="{% url 'posts:group_list' post.group.slug %}"></a>
+  {% endif %}
+{% endfor %}
+'''
+
+# Тот же цикл по элементам презентера.
+PRESENTER_TEMPLATE = '''
+{% for item in feed %}
+  {{ item.author_name }}
+  <a href="{{ item.author_url }}"></a>
+  {{ item.pub_date|date:"d E Y" }} {{ item.text }}
+  <a href="{{ item.detail_url }}"></a>
+  {% if item.group_url %}
+    <a href="{{ item.group_url }}"></a>
+  {% endif %}
+{% endfor %}
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки страницы ленты с {% url %} '
+        'для каждой публикации и с ссылками из презентера'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--per-page', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        engine = engines.all()[0]
+        request = RequestFactory().get('/')
+        templates = {
+            'reverse': engine.from_string(REVERSE_TEMPLATE),
+            'presenter': engine.from_string(PRESENTER_TEMPLATE),
+        }
+        with rollback_after():
+            seed_posts(options['posts'])
+            # Публикации загружаются один раз: замеряется только отрисовка
+            # вместе с построением ссылок.
+            page_obj = paginate(Post.objects.feed(), 1, options['per_page'])
+            list(page_obj)
+
+            results = {
+                'reverse': measure(
+                    lambda: templates['reverse'].render(
+                        {'page_obj': page_obj}, request
+                    ),
+                    options['repeat'],
+                ),
+                'presenter': measure(
+                    lambda: templates['presenter'].render(
+                        {'feed': FeedPage(page_obj)}, request
+                    ),
+                    options['repeat'],
+                ),
+            }
+        for mode, timings in results.items():
+            self.stdout.write(f'{mode}: {summarize(timings)} мс')
@@ -0,0 +1,128 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sqlite import PRODUCTION_PRAGMAS
+
+
+# Режимы сравнения: (PRAGMA, постоянное соединение на поток).
+PROFILES = {
+    'default': ({}, False),
+    'tuned': (PRODUCTION_PRAGMAS, True),
+}
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+    return connection
+
+
+class Worker(threading.Thread):
+    """Поток, выполняющий чтения или записи до истечения срока"""
+
+    def __init__(self, path, pragmas, persistent, write, rows, deadline):
+        super().__init__(daemon=True)
+        self.path = path
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.write = write
+        self.rows = rows
+        self.deadline = deadline
+        self.operations = 0
+        self.errors = 0
+
+    def execute(self, connection):
+        if self.write:
+            connection.execute(
+                'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+                ('Текст публикации', time.time()),
+            )
+            return
+        start = random.randint(1, self.rows)
+        connection.execute(
+            'SELECT id, text, pub_date FROM post WHERE id >= ? '
+            'ORDER BY id LIMIT 10',
+            (start,),
+        ).fetchall()
+
+    def run(self):
+        connection = None
+        while time.monotonic() < self.deadline:
+            if connection is None:
+                connection = connect(self.path, self.pragmas)
+            try:
+                self.execute(connection)
+                self.operations += 1
+            except sqlite3.OperationalError:
+                # database is locked: писатель не дождался блокировки.
+                self.errors += 1
+            if not self.persistent:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременных '
+        'чтениях и записях с настройками по умолчанию и с PRAGMA '
+        'и постоянными соединениями, как в yatube.settings_prod'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0)
+
+    def seed(self, path, rows):
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, '
+            'text TEXT NOT NULL, pub_date REAL NOT NULL)'
+        )
+        connection.executemany(
+            'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+            (('Текст публикации', time.time()) for _ in range(rows)),
+        )
+        connection.commit()
+        connection.close()
+
+    def run_profile(self, pragmas, persistent, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            self.seed(path, options['rows'])
+            deadline = time.monotonic() + options['duration']
+            workers = [
+                Worker(path, pragmas, persistent, write, options['rows'],
+                       deadline)
+                for write in (
+                    [False] * options['readers'] + [True] * options['writers']
+                )
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        return workers
+
+    def handle(self, *args, **options):
+        duration = options['duration']
+        for name, (pragmas, persistent) in PROFILES.items():
+            workers = self.run_profile(pragmas, persistent, options)
+            reads = sum(w.operations for w in workers if not w.write)
+            writes = sum(w.operations for w in workers if w.write)
+            errors = sum(w.errors for w in workers)
+            self.stdout.write(
+                f'{name}: чтений {reads / duration:.0f}/с, '
+                f'записей {writes / duration:.0f}/с, '
+                f'ошибок блокировки {errors}'
+            )
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.benchmarks import (
+    measure, rollback_after, seed_followers, seed_posts
+)
+from core.perf import summarize
+from posts import timelines
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленту подписок при рассылке публикаций подписчикам '
+        '(fan-out-on-write), при сборке во время чтения (fan-out-on-read) '
+        'и запрос с JOIN по подпискам для автора с большим числом '
+        'подписчиков'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--followers', type=int, default=100_000)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        followers = options['followers']
+        repeat = options['repeat']
+        with rollback_after():
+            self.stdout.write(
+                f'Создаем {options["posts"]} публикаций '
+                f'и {followers} подписчиков...'
+            )
+            author_ids, _ = seed_posts(options['posts'])
+            author_id = author_ids[0]
+            follower_ids = seed_followers(author_id, followers)
+            reader_id = follower_ids[0]
+            cache.clear()
+
+            def publish():
+                # Сигнал post_save ставит рассылку в очередь после фиксации
+                # транзакции, а данные бенчмарка откатываются: рассылка
+                # выполняется явно.
+                post = Post.objects.create(
+                    text='Новая публикация', author_id=author_id
+                )
+                timelines.fan_out(post)
+
+            def join():
+                list(Post.objects.filter(
+                    author__following__user_id=reader_id
+                ).order_by('-pub_date', '-pk').values_list('pk')[:10])
+
+            results = {}
+            with override_settings(TIMELINE_FANOUT_LIMIT=followers):
+                # Ленты всех подписчиков собраны: худший случай рассылки.
+                keys = [
+                    timelines._timeline_key(follower_id)
+                    for follower_id in follower_ids
+                ]
+                cache.set_many(dict.fromkeys(keys, []), None)
+                # Кэш может вместить не все ленты (например, MAX_ENTRIES
+                # у LocMemCache): рассылка идет только в собранные.
+                self.stdout.write(
+                    f'Лент в кэше: {len(cache.get_many(keys))}'
+                )
+                results['fan-out-on-write: публикация'] = measure(
+                    publish, repeat
+                )
+                results['fan-out-on-write: чтение'] = measure(
+                    lambda: timelines.timeline(reader_id), repeat
+                )
+            with override_settings(TIMELINE_FANOUT_LIMIT=followers - 1):
+                results['fan-out-on-read: публикация'] = measure(
+                    publish, repeat
+                )
+                results['fan-out-on-read: чтение'] = measure(
+                    lambda: timelines.timeline(reader_id), repeat
+                )
+            results['JOIN по подпискам'] = measure(join, repeat)
+        cache.clear()
+        for mode, timings in results.items():
+            self.stdout.write(f'{mode}: {summarize(timings)} мс')
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.models import Task
+from core.perf import summarize
+from core.tasks import dump_payload
+from posts import groups, tasks
+from posts.models import Post
+
+
+User = get_user_model()
+
+PREFIX = 'bench_writer_'
+POST_TASKS = (tasks.index_post, tasks.unindex_post, tasks.fan_out_post)
+
+
+class Writer(threading.Thread):
+    """Пользователь, создающий публикации до истечения срока"""
+
+    def __init__(self, user, group_id, deadline, host):
+        super().__init__(daemon=True)
+        self.host = host
+        self.user = user
+        self.group_id = group_id
+        self.deadline = deadline
+        self.timings = []
+        self.errors = 0
+
+    def run(self):
+        client = Client(HTTP_HOST=self.host)
+        client.force_login(self.user)
+        url = reverse('posts:post_create')
+        data = {'text': 'Публикация для бенчмарка'}
+        if self.group_id:
+            data['group'] = self.group_id
+        try:
+            while time.monotonic() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    response = client.post(url, data)
+                    ok = response.status_code == 302
+                except Exception:
+                    ok = False
+                self.timings.append((time.perf_counter() - started) * 1000)
+                self.errors += not ok
+        finally:
+            # У каждого потока свое соединение с БД.
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность post_create при одновременных '
+        'авторах на текущей базе данных. Для SQLite в режиме WAL или '
+        'PostgreSQL (POSTGRES_DB) запускайте с '
+        '--settings=yatube.settings_prod. Созданные данные и задачи '
+        'очереди для них удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, nargs='+',
+                            default=[1, 4, 16])
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--host', default='localhost',
+                            help='Заголовок Host из ALLOWED_HOSTS')
+
+    def describe_database(self):
+        description = connection.vendor
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                description += f', journal_mode={cursor.fetchone()[0]}'
+        return description
+
+    def cleanup(self):
+        """Удаляет авторов бенчмарка, их публикации и задачи по ним"""
+        authors = User.objects.filter(username__startswith=PREFIX)
+        post_ids = list(
+            Post.objects.filter(author__in=authors)
+            .values_list('pk', flat=True)
+        )
+        # Публикации удаляются каскадом вместе с авторами.
+        authors.delete()
+        # При TASKS_EAGER=0 по каждой публикации в очереди остаются
+        # задачи индексации и рассылки, а после удаления - и unindex.
+        names = [func.task_name for func in POST_TASKS]
+        for start in range(0, len(post_ids), 500):
+            payloads = [
+                dump_payload(post_id)
+                for post_id in post_ids[start:start + 500]
+            ]
+            Task.objects.filter(
+                name__in=names, payload__in=payloads
+            ).delete()
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'База данных: {self.describe_database()}')
+        group = next(iter(groups.all_groups()), None)
+        group_id = group.pk if group else None
+        self.cleanup()
+        users = [
+            User.objects.create_user(f'{PREFIX}{number}')
+            for number in range(max(options['writers']))
+        ]
+        try:
+            for count in options['writers']:
+                deadline = time.monotonic() + options['duration']
+                writers = [
+                    Writer(user, group_id, deadline, options['host'])
+                    for user in users[:count]
+                ]
+                for writer in writers:
+                    writer.start()
+                for writer in writers:
+                    writer.join()
+                timings = [t for writer in writers for t in writer.timings]
+                errors = sum(writer.errors for writer in writers)
+                created = len(timings) - errors
+                self.stdout.write(
+                    f'{count:3} авторов: {summarize(timings)} мс, '
+                    f'записей {created / options["duration"]:.1f}/с, '
+                    f'ошибок {errors}'
+                )
+        finally:
+            self.cleanup()
@@ -0,0 +1,197 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarks import isolated_cache, rollback_after, seed_posts
+from core.perf import summarize
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку (p50/p95/p99), число запросов к БД и '
+        'пропускную способность всех страниц posts на заданных объемах '
+        'данных. Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--volumes', type=int, nargs='+', default=[10_000],
+            help='Число публикаций, например 10000 100000 1000000',
+        )
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Запросов на каждую страницу')
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Читать ленты без авторизации')
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом')
+        parser.add_argument('--save', help='Сохранить результат в JSON')
+        parser.add_argument('--compare', help='Сравнить с JSON-базой')
+        parser.add_argument('--tolerance', type=float, default=20,
+                            help='Допустимый рост p95, проценты')
+
+    def endpoints(self, author, group, post_ids):
+        """Пары (имя, функция запроса) для каждой страницы"""
+        reader = Client()
+        writer = Client()
+        writer.force_login(author)
+        if not self.anonymous:
+            reader.force_login(author)
+
+        def pages(view_name, **kwargs):
+            url = reverse(view_name, kwargs=kwargs)
+            numbers = iter(range(10 ** 9))
+            return lambda: reader.get(url, {'page': next(numbers) % 50 + 1})
+
+        def api_pages(view_name, **kwargs):
+            # Клиент API листает ленту по ссылкам next, как и приложения.
+            first = reverse(view_name, kwargs=kwargs)
+            state = {'url': first, 'page': 0}
+
+            def request():
+                response = reader.get(state['url'])
+                state['page'] += 1
+                state['url'] = response.json().get('next') or first
+                if state['page'] % 50 == 0:
+                    state['url'] = first
+                return response
+            return request
+
+        def api_detail():
+            post_id = post_ids[next(counter) % len(post_ids)]
+            return reader.get(
+                reverse('posts:api_post_detail', kwargs={'post_id': post_id})
+            )
+
+        def detail():
+            post_id = post_ids[next(counter) % len(post_ids)]
+            return reader.get(
+                reverse('posts:post_detail', kwargs={'post_id': post_id})
+            )
+
+        def create():
+            return writer.post(
+                reverse('posts:post_create'),
+                {'text': 'Новая публикация', 'group': group.pk},
+            )
+
+        def edit():
+            post_id = own_ids[next(counter) % len(own_ids)]
+            return writer.post(
+                reverse('posts:post_edit', kwargs={'post_id': post_id}),
+                {'text': 'Исправленная публикация', 'group': group.pk},
+            )
+
+        counter = iter(range(10 ** 9))
+        own_ids = list(Post.objects.filter(author=author).values_list(
+            'pk', flat=True
+        )[:100])
+        return {
+            'index': pages('posts:index'),
+            'group_posts': pages('posts:group_list', slug=group.slug),
+            'profile': pages('posts:profile', username=author.username),
+            'post_detail': detail,
+            'post_create': create,
+            'post_edit': edit,
+            'api_index': api_pages('posts:api_index'),
+            'api_group': api_pages('posts:api_group_list', slug=group.slug),
+            'api_profile': api_pages(
+                'posts:api_profile', username=author.username
+            ),
+            'api_detail': api_detail,
+        }
+
+    def run_endpoint(self, request, count):
+        timings = []
+        queries = []
+        started = time.perf_counter()
+        for _ in range(count):
+            if self.cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                request_started = time.perf_counter()
+                response = request()
+                timings.append(
+                    (time.perf_counter() - request_started) * 1000
+                )
+            if response.status_code >= 400:
+                raise CommandError(f'Ответ {response.status_code}')
+            queries.append(len(context.captured_queries))
+        elapsed = time.perf_counter() - started
+        return {
+            **summarize(timings),
+            'queries': round(sum(queries) / len(queries), 2),
+            'rps': round(count / elapsed, 1),
+        }
+
+    def run_volume(self, posts, options):
+        with isolated_cache(), rollback_after():
+            seed_posts(posts, options['authors'], options['groups'])
+            author = User.objects.filter(
+                username__startswith='bench_author_'
+            ).first()
+            group = Group.objects.filter(
+                slug__startswith='bench-group-'
+            ).first()
+            post_ids = list(
+                Post.objects.values_list('pk', flat=True)[:1000]
+            )
+            return {
+                name: self.run_endpoint(request, options['requests'])
+                for name, request in self.endpoints(
+                    author, group, post_ids
+                ).items()
+            }
+
+    def handle(self, *args, **options):
+        self.anonymous = options['anonymous']
+        self.cold = options['cold']
+        results = {}
+        for posts in options['volumes']:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{posts} публикаций'
+            ))
+            results[str(posts)] = self.run_volume(posts, options)
+            for name, stats in results[str(posts)].items():
+                self.stdout.write(f'  {name:12} {stats}')
+
+        if options['save']:
+            with open(options['save'], 'w') as baseline:
+                json.dump(results, baseline, indent=2, ensure_ascii=False)
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = []
+        for volume, endpoints in results.items():
+            for name, stats in endpoints.items():
+                base = baseline.get(volume, {}).get(name)
+                if base is None:
+                    continue
+                growth = (stats['p95'] - base['p95']) / base['p95'] * 100
+                line = (
+                    f'{volume} {name}: p95 {base["p95"]} -> {stats["p95"]} '
+                    f'мс ({growth:+.0f}%), запросов {base["queries"]} -> '
+                    f'{stats["queries"]}'
+                )
+                if growth > tolerance or stats['queries'] > base['queries']:
+                    regressions.append(line)
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'Регрессий: {len(regressions)}')
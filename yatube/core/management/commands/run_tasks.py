@@ -0,0 +1,33 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import run_batch
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи фоновой очереди пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Пауза при пустой очереди, секунды')
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить готовые задачи и завершиться')
+
+    def handle(self, *args, **options):
+        worker = uuid.uuid4().hex
+        total = 0
+        try:
+            while True:
+                processed = run_batch(options['batch_size'], worker)
+                total += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Выполнено задач: {total}')
@@ -0,0 +1,84 @@
+import time
+import traceback
+import uuid
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.mail import load_message
+from core.models import OutgoingEmail
+from core.queue import claim, reschedule
+
+
+class Command(BaseCommand):
+    help = (
+        'Доставляет письма из очереди пачками через одно соединение '
+        'MAIL_SPOOL_BACKEND с ограничением скорости и повторами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--rate', type=float, default=settings.MAIL_SPOOL_RATE,
+            help='Не больше писем в секунду (0 — без ограничения)',
+        )
+        parser.add_argument('--sleep', type=float, default=5.0,
+                            help='Пауза при пустой очереди, секунды')
+        parser.add_argument('--once', action='store_true',
+                            help='Отправить готовые письма и завершиться')
+
+    def handle(self, *args, **options):
+        self.interval = 1 / options['rate'] if options['rate'] else 0
+        self.last_sent = 0
+        worker = uuid.uuid4().hex
+        connection = get_connection(settings.MAIL_SPOOL_BACKEND)
+        sent = failed = 0
+        try:
+            while True:
+                emails = claim(OutgoingEmail, options['batch_size'], worker)
+                if not emails:
+                    if options['once']:
+                        break
+                    connection.close()
+                    time.sleep(options['sleep'])
+                    continue
+                batch_sent, batch_failed = self.deliver(connection, emails)
+                sent += batch_sent
+                failed += batch_failed
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(f'Отправлено писем: {sent}, ошибок: {failed}')
+
+    def throttle(self):
+        delay = self.last_sent + self.interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.last_sent = time.monotonic()
+
+    def deliver(self, connection, emails):
+        """Отправляет пачку писем; возвращает (отправлено, ошибок)"""
+        delivered = []
+        failed = 0
+        for email in emails:
+            self.throttle()
+            try:
+                message = load_message(email.message)
+                # open() переиспользует уже открытое соединение.
+                connection.open()
+                connection.send_messages([message])
+            except Exception:
+                failed += 1
+                reschedule(
+                    email, traceback.format_exc(),
+                    settings.MAIL_SPOOL_RETRY_DELAY,
+                )
+                # После сбоя соединение может быть в неизвестном
+                # состоянии: следующее письмо откроет новое.
+                connection.close()
+            else:
+                delivered.append(email.pk)
+        OutgoingEmail.objects.filter(pk__in=delivered).delete()
+        return len(delivered), failed
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.template_backend import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает и компилирует все шаблоны проекта; '
+        'завершается с ошибкой, если какой-либо шаблон не компилируется'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names = warm_templates()
+        elapsed = (time.perf_counter() - started) * 1000
+        for name in names:
+            self.stdout.write(name, self.style.SQL_FIELD)
+        self.stdout.write(
+            f'Загружено шаблонов: {len(names)} за {elapsed:.1f} мс'
+        )
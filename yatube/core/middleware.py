@@ -0,0 +1,190 @@
+import hashlib
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+
+from core import db_router, perf
+from posts import feed_cache
+
+
+# Ленты, которые одинаковы для всех анонимных читателей:
+# имя URL -> (лента, имя аргумента URL с идентификатором ленты).
+ANONYMOUS_CACHED_VIEWS = {
+    'posts:index': (feed_cache.INDEX, None),
+    'posts:group_list': (feed_cache.GROUP, 'slug'),
+    'posts:profile': (feed_cache.AUTHOR, 'username'),
+}
+# Параметры, от которых зависит страница ленты. Запросы с другими
+# параметрами (utm-метки и т.п.) не кэшируются, чтобы не плодить копии.
+ANONYMOUS_CACHE_PARAMS = ('page', 'cursor', 'q')
+
+
+class AnonymousFeedCacheMiddleware:
+    """
+    Отдает анонимным пользователям закэшированные страницы лент.
+    ETag и Last-Modified строятся по версии ленты, поэтому на условный
+    запрос ответ 304 отдается без обращения к базе и шаблонам.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        feed = self.get_feed(request)
+        if feed is None:
+            return self.get_response(request)
+
+        scope, ident = feed
+        params = urlencode([
+            (name, request.GET[name])
+            for name in ANONYMOUS_CACHE_PARAMS if name in request.GET
+        ])
+        version, modified = feed_cache.feed_state(scope, ident)
+        etag = quote_etag(hashlib.md5(
+            f'{scope}:{ident}:{version}:{params}'.encode()
+        ).hexdigest())
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=modified
+        )
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, modified)
+
+        key = f'anonymous_page:{etag}'
+        response = cache.get(key)
+        if response is None:
+            response = self.get_response(request)
+            if response.status_code == 200 and not response.cookies:
+                cache.set(
+                    key, response, settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+                )
+        return self.set_validators(response, etag, modified)
+
+    @staticmethod
+    def get_feed(request):
+        """Лента запрошенной страницы или None, если кэш не применим"""
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.user.is_authenticated:
+            return None
+        if any(
+            name not in ANONYMOUS_CACHE_PARAMS
+            or len(request.GET.getlist(name)) > 1
+            for name in request.GET
+        ):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name not in ANONYMOUS_CACHED_VIEWS:
+            return None
+        scope, kwarg = ANONYMOUS_CACHED_VIEWS[match.view_name]
+        return scope, match.kwargs[kwarg] if kwarg else ''
+
+    @staticmethod
+    def set_validators(response, etag, modified):
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Замеряет время запроса, число и время запросов к БД, время
+    отрисовки шаблонов и обращения к кэшу. Копит их в perf.rolling_stats
+    по имени URL и отдает в заголовке Server-Timing сотрудникам, при
+    DEBUG или при включенной настройке SERVER_TIMING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = perf.start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(perf.time_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            perf.finish_request(token)
+        total = (time.perf_counter() - stats.started) * 1000
+        if self.show_timing(request):
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={stats.db_time:.1f};'
+                f'desc="{stats.db_queries} queries"',
+                f'tpl;dur={stats.template_time:.1f}',
+                f'cache;desc="hits={stats.cache_hits} '
+                f'misses={stats.cache_misses}"',
+                f'total;dur={total:.1f}',
+            ))
+        perf.rolling_stats.add(self.url_name(request), stats.as_dict(total))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = perf.current()
+        if stats is not None:
+            stats.view = f'{view_func.__module__}.{view_func.__name__}'
+
+    @staticmethod
+    def show_timing(request):
+        """Отдавать ли Server-Timing: он раскрывает устройство сайта"""
+        if settings.SERVER_TIMING or settings.DEBUG:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    @staticmethod
+    def url_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return '<unresolved>'
+        return match.view_name
+
+
+class ReplicaPinningMiddleware:
+    """
+    Закрепляет за основной базой изменяющие запросы и все запросы
+    клиента в течение REPLICA_PIN_SECONDS после них, чтобы он видел
+    свои изменения несмотря на отставание реплик.
+    """
+
+    cookie_name = 'primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not db_router.replica_aliases():
+            return self.get_response(request)
+        writing = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        token = db_router.pin_primary(writing or pinned_until > time.time())
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.unpin_primary(token)
+        if writing:
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
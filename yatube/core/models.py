@@ -0,0 +1,83 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedItem(models.Model):
+    """Общие поля элементов очередей с повторами"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Состояние'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Число попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не раньше'
+    )
+    worker = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана'
+    )
+
+    class Meta:
+        abstract = True
+
+
+class Task(QueuedItem):
+    """Отложенная задача фоновой очереди"""
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    payload = models.TextField(verbose_name='Аргументы в JSON')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='task_status_run_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
+
+
+class OutgoingEmail(QueuedItem):
+    """Письмо в очереди на отправку"""
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    recipients = models.TextField(verbose_name='Получатели')
+    message = models.TextField(verbose_name='Сериализованное письмо')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='email_status_run_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients}'
@@ -0,0 +1,84 @@
+"""
+Одновременное выполнение независимых запросов к БД внутри вью.
+
+Django 2.2 не умеет асинхронных вью и ORM, поэтому запросы, которые не
+зависят друг от друга (страница ленты, число объектов, автор или группа),
+выполняются в общем пуле потоков процесса. Размер пула задает
+VIEW_QUERY_WORKERS; при 0 функции выполняются по очереди.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from core import perf
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _executor(size):
+    with _executors_lock:
+        if size not in _executors:
+            _executors[size] = ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix='view-queries'
+            )
+        return _executors[size]
+
+
+def _run_in_worker(func):
+    """
+    Выполняет func в потоке пула. Соединения потока обслуживаются как
+    в запросе: устаревшие закрываются до и после работы.
+    """
+    _worker.active = True
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            if perf.current() is not None:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(perf.time_query)
+                    )
+            return func()
+    finally:
+        close_old_connections()
+        _worker.active = False
+
+
+def parallel_enabled():
+    """
+    Можно ли вынести запросы в пул: пул включен, вызов идет не из его
+    потока, и нет открытой транзакции, чьи данные другие соединения
+    не видят.
+    """
+    return bool(
+        settings.VIEW_QUERY_WORKERS
+        and not getattr(_worker, 'active', False)
+        and not any(
+            connection.in_atomic_block for connection in connections.all()
+        )
+    )
+
+
+def run_parallel(*funcs):
+    """
+    Выполняет функции без аргументов одновременно и возвращает список
+    их результатов. Первая функция выполняется в вызывающем потоке,
+    остальные - в пуле с копией контекста (закрепление за основной
+    базой и показатели запроса сохраняются).
+    """
+    if len(funcs) < 2 or not parallel_enabled():
+        return [func() for func in funcs]
+    pool = _executor(settings.VIEW_QUERY_WORKERS)
+    futures = [
+        pool.submit(copy_context().run, _run_in_worker, func)
+        for func in funcs[1:]
+    ]
+    first = funcs[0]()
+    return [first] + [future.result() for future in futures]
@@ -0,0 +1,139 @@
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+_current = ContextVar('request_stats', default=None)
+
+
+def summarize(timings):
+    """Считает перцентили по списку времен в мс"""
+    ordered = sorted(timings)
+
+    def percentile(value):
+        index = min(len(ordered) - 1, int(len(ordered) * value / 100))
+        return round(ordered[index], 3)
+
+    return {
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+        'mean': round(statistics.mean(ordered), 3),
+    }
+
+
+class RequestStats:
+    """Показатели одного запроса"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def as_dict(self, total):
+        return {
+            'total': total,
+            'db_queries': self.db_queries,
+            'db_time': self.db_time,
+            'template_time': self.template_time,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def start_request():
+    """Начинает сбор показателей для текущего запроса"""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def current():
+    """Показатели текущего запроса или None вне запроса"""
+    return _current.get()
+
+
+def record_query(duration):
+    stats = _current.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += duration
+
+
+def time_query(execute, sql, params, many, context):
+    """Обертка execute_wrapper, которая учитывает запрос в показателях"""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_query((time.perf_counter() - started) * 1000)
+
+
+def record_template(duration):
+    stats = _current.get()
+    if stats is not None:
+        stats.template_time += duration
+
+
+def record_cache(hits, misses):
+    stats = _current.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+class RollingStats:
+    """Последние N замеров по каждому имени URL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(self._new_window)
+
+    @staticmethod
+    def _new_window():
+        return deque(maxlen=settings.PERF_STATS_WINDOW)
+
+    def add(self, url_name, sample):
+        with self._lock:
+            self._samples[url_name].append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self):
+        """Сводка по каждому URL: перцентили времени и средние значения"""
+        with self._lock:
+            samples = {name: list(window)
+                       for name, window in self._samples.items()}
+        report = {}
+        for name, window in samples.items():
+            count = len(window)
+            report[name] = {
+                'requests': count,
+                'total_ms': summarize([sample['total'] for sample in window]),
+                **{
+                    f'avg_{key}': round(
+                        sum(sample[key] for sample in window) / count, 3
+                    )
+                    for key in (
+                        'db_queries', 'db_time', 'template_time',
+                        'cache_hits', 'cache_misses',
+                    )
+                },
+            }
+        return report
+
+
+rolling_stats = RollingStats()
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+def claim(model, batch_size, worker):
+    """
+    Забирает до batch_size готовых элементов очереди model, включая
+    зависшие у упавших обработчиков; зависшие без оставшихся попыток
+    помечаются FAILED. Захват идет через UPDATE с проверкой состояния,
+    поэтому один элемент не возьмут два обработчика.
+    """
+    now = timezone.now()
+    stale = Q(
+        status=model.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT),
+    )
+    # Зависший элемент, у которого попытки кончились, не выдается снова.
+    model.objects.filter(stale, attempts__gte=F('max_attempts')).update(
+        status=model.FAILED,
+        worker='',
+        locked_at=None,
+        last_error='Обработчик не завершил последнюю попытку',
+    )
+    ready = model.objects.filter(
+        Q(status=model.PENDING, run_after__lte=now)
+        | stale & Q(attempts__lt=F('max_attempts'))
+    )
+    ids = list(
+        ready.order_by('run_after', 'pk').values_list('pk', flat=True)
+        [:batch_size]
+    )
+    if not ids:
+        return []
+    ready.filter(pk__in=ids).update(
+        status=model.RUNNING,
+        worker=worker,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(model.objects.filter(
+        pk__in=ids, worker=worker, locked_at=now
+    ).order_by('run_after', 'pk'))
+
+
+def reschedule(item, error, retry_delay):
+    """
+    Откладывает неудавшийся элемент с экспоненциальной задержкой или
+    помечает его FAILED после max_attempts попыток.
+    """
+    item.last_error = error
+    item.worker = ''
+    item.locked_at = None
+    if item.attempts >= item.max_attempts:
+        item.status = item.FAILED
+    else:
+        item.status = item.PENDING
+        item.run_after = timezone.now() + timedelta(
+            seconds=retry_delay * 2 ** (item.attempts - 1)
+        )
+    item.save(update_fields=(
+        'status', 'run_after', 'worker', 'locked_at', 'last_error'
+    ))
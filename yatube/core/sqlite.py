@@ -0,0 +1,12 @@
+# PRAGMA SQLite для боевого окружения (yatube.settings_prod).
+# WAL позволяет читать во время записи; synchronous=NORMAL в режиме WAL
+# не теряет целостность, а fsync выполняется только на контрольных точках.
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # Отрицательное значение задает размер кэша страниц в КиБ (64 МиБ)
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
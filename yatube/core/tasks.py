@@ -0,0 +1,93 @@
+"""
+Фоновая очередь задач в таблице core.Task.
+
+Функция регистрируется декоратором @task и ставится в очередь вызовом
+func.delay(*args, **kwargs) после фиксации текущей транзакции. Задачи
+выполняет команда run_tasks. При TASKS_EAGER задачи выполняются в
+вызывающем процессе, тоже после фиксации транзакции.
+"""
+import json
+import logging
+import traceback
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Task
+from .queue import claim, reschedule
+
+
+logger = logging.getLogger('yatube.tasks')
+
+_registry = {}
+
+
+def task(func=None, *, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу"""
+    if func is None:
+        return partial(task, max_attempts=max_attempts)
+    name = f'{func.__module__}.{func.__qualname__}'
+    _registry[name] = func
+    func.task_name = name
+    func.delay = partial(enqueue, name, max_attempts=max_attempts)
+    return func
+
+
+def dump_payload(*args, **kwargs):
+    """Аргументы задачи в том виде, в каком они хранятся в Task.payload"""
+    return json.dumps({'args': args, 'kwargs': kwargs})
+
+
+def enqueue(name, *args, max_attempts=None, **kwargs):
+    """
+    Ставит задачу в очередь (при TASKS_EAGER - выполняет) после
+    фиксации текущей транзакции
+    """
+    if name not in _registry:
+        raise KeyError(f'Задача {name} не зарегистрирована')
+    if settings.TASKS_EAGER:
+        # Как и в очереди, задача видит только зафиксированные данные.
+        transaction.on_commit(partial(_registry[name], *args, **kwargs))
+        return
+    # Аргументы сериализуются сразу, чтобы ошибка возникла у вызывающего.
+    payload = dump_payload(*args, **kwargs)
+    transaction.on_commit(lambda: Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    ))
+
+
+def execute(task_obj):
+    """Выполняет задачу; возвращает текст ошибки или None"""
+    func = _registry.get(task_obj.name)
+    if func is None:
+        return f'Задача {task_obj.name} не зарегистрирована'
+    payload = json.loads(task_obj.payload)
+    try:
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        logger.exception('Ошибка задачи %s (#%s)', task_obj.name, task_obj.pk)
+        return traceback.format_exc()
+    return None
+
+
+def run_batch(batch_size=100, worker=None):
+    """
+    Выполняет пачку задач. Успешные удаляются, упавшие откладываются
+    с экспоненциальной задержкой или помечаются как FAILED после
+    max_attempts попыток. Возвращает число выполненных задач.
+    """
+    worker = worker or uuid.uuid4().hex
+    tasks = claim(Task, batch_size, worker)
+    done = []
+    for task_obj in tasks:
+        error = execute(task_obj)
+        if error is None:
+            done.append(task_obj.pk)
+        else:
+            reschedule(task_obj, error, settings.TASKS_RETRY_DELAY)
+    Task.objects.filter(pk__in=done).delete()
+    return len(tasks)
@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates, Template
+
+from core import perf
+
+
+class TimedTemplate(Template):
+    """Шаблон, который замеряет время своей отрисовки"""
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            perf.record_template((time.perf_counter() - started) * 1000)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django с замером времени отрисовки шаблонов"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self
+        )
+
+
+def template_dirs(engine):
+    """
+    Каталоги, в которых ищут шаблоны загрузчики движка, включая
+    templates/ приложений и загрузчики внутри кэширующего.
+    """
+    dirs = []
+    loaders = list(engine.engine.template_loaders)
+    while loaders:
+        loader = loaders.pop(0)
+        loaders[:0] = getattr(loader, 'loaders', [])
+        for directory in getattr(loader, 'get_dirs', list)():
+            if directory not in dirs:
+                dirs.append(directory)
+    return dirs
+
+
+def warm_templates():
+    """
+    Загружает и компилирует все шаблоны из каталогов загрузчиков, чтобы
+    кэширующий загрузчик держал их в памяти до первого запроса.
+    Возвращает список имен загруженных шаблонов.
+    """
+    names = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in template_dirs(engine):
+            for root, _, files in os.walk(directory):
+                for filename in sorted(files):
+                    if not filename.endswith('.html'):
+                        continue
+                    name = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    ).replace(os.sep, '/')
+                    if name in names:
+                        continue
+                    engine.get_template(name)
+                    names.append(name)
+    return names
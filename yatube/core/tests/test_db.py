@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core.db import apply_sqlite_pragmas, fingerprint, slow_query_log
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        Post.objects.create(text='Текст поста', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        slow_query_log.clear()
+
+    def test_fingerprint_normalizes_values(self):
+        """Запросы с разными значениями дают один отпечаток"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 1 AND b IN (%s, %s)"),
+            fingerprint("SELECT *  FROM t WHERE a = 25 AND b IN (%s)"),
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE name = 'it''s'"),
+            'SELECT * FROM t WHERE name = ?',
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_grouped_with_view_and_plan(self):
+        """Медленный запрос записывается с вью и планом выполнения"""
+        with self.assertLogs('yatube.slow_queries', 'WARNING'):
+            for _ in range(2):
+                cache.clear()
+                Client().get(
+                    reverse('posts:profile', kwargs={'username': 'User'})
+                )
+        entry = next(
+            entry for entry in slow_query_log.snapshot()
+            if 'FROM "auth_user"' in entry['fingerprint']
+        )
+        self.assertEqual(entry['count'], 2)
+        self.assertEqual(entry['views'], ['posts.views.profile'])
+        self.assertIn('auth_user', entry['explain'])
+
+
+class SqlitePragmasTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4000})
+    def test_pragmas_applied_to_connection(self):
+        """PRAGMA из настроек выполняются на новом соединении"""
+        apply_sqlite_pragmas(None, connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4000)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size; DROP TABLE x': 1})
+    def test_invalid_pragma_name_rejected(self):
+        """Имя PRAGMA не может содержать произвольный SQL"""
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(None, connection)
@@ -0,0 +1,152 @@
+from contextvars import Context
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import reverse
+from django.test import (
+    RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+)
+
+from core import db_router
+from core.middleware import ReplicaPinningMiddleware
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@mock.patch.object(db_router, 'replica_aliases',
+                   return_value=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_go_to_healthy_replica(self, aliases):
+        """Чтения распределяются только по репликам с малым отставанием"""
+        lags = {'replica1': 60.0, 'replica2': 0.5}
+        with mock.patch.object(db_router, 'replica_lag', lags.get):
+            for _ in range(10):
+                self.assertEqual(
+                    self.router.db_for_read(Post), 'replica2'
+                )
+
+    def test_lagging_or_unavailable_replicas_fall_back(self, aliases):
+        """Если все реплики отстают или недоступны, читаем с основной"""
+        lags = {'replica1': 60.0, 'replica2': None}
+        with mock.patch.object(db_router, 'replica_lag', lags.get):
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def setUp(self):
+        self.router = db_router.ReplicaRouter()
+        # Как в запросе, пропущенном ReplicaPinningMiddleware.
+        self.token = db_router.pin_primary(False)
+        self.addCleanup(db_router.unpin_primary, self.token)
+
+    def test_pinned_reads_and_writes_use_primary(self, aliases):
+        """Записи и чтения в закрепленном контексте идут в основную базу"""
+        with mock.patch.object(db_router, 'replica_lag', return_value=0):
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+            with db_router.primary():
+                self.assertEqual(self.router.db_for_read(Post), 'default')
+            self.assertNotEqual(self.router.db_for_read(Post), 'default')
+
+    def test_reads_outside_requests_use_primary(self, aliases):
+        """Вне запроса (команды, задачи) чтения идут в основную базу"""
+        with mock.patch.object(db_router, 'replica_lag', return_value=0):
+            self.assertEqual(
+                Context().run(self.router.db_for_read, Post), 'default'
+            )
+
+    def test_replicas_are_not_migrated(self, aliases):
+        """Схема реплик приходит с основной базы"""
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+@mock.patch.object(db_router, 'replica_aliases', return_value=['replica1'])
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.pinned = []
+        self.middleware = ReplicaPinningMiddleware(self.view)
+
+    def view(self, request):
+        self.pinned.append(db_router.primary_pinned())
+        return HttpResponse()
+
+    def test_write_pins_following_reads(self, aliases):
+        """После POST клиент читает с основной базы до истечения срока"""
+        response = self.middleware(self.factory.post('/create/'))
+        cookie = response.cookies[ReplicaPinningMiddleware.cookie_name]
+        request = self.factory.get('/')
+        request.COOKIES[cookie.key] = cookie.value
+        self.middleware(request)
+        self.middleware(self.factory.get('/'))
+        self.assertEqual(self.pinned, [True, True, False])
+        # После запроса чтения снова идут в основную базу.
+        self.assertTrue(db_router.primary_pinned())
+
+    def test_expired_or_broken_pin_is_ignored(self, aliases):
+        """Истекшая или испорченная метка не закрепляет чтения"""
+        for value in ('0', 'garbage'):
+            request = self.factory.get('/')
+            request.COOKIES[ReplicaPinningMiddleware.cookie_name] = value
+            self.middleware(request)
+        self.assertEqual(self.pinned, [False, False])
+
+
+# База replica объявлена в yatube.settings_test.
+@skipUnless('replica' in settings.DATABASES, 'нет базы replica')
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaDatabaseTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        Group.objects.using('default').create(title='Основная', slug='main')
+        Group.objects.using('replica').create(title='Копия', slug='copy')
+        # База в REPLICA_DATABASES, и TransactionTestCase не очищает
+        # ее таблицы: роутер запрещает в нее миграции.
+        self.addCleanup(Group.objects.using('replica').all().delete)
+        self.factory = RequestFactory()
+
+    def slugs(self):
+        return list(Group.objects.values_list('slug', flat=True))
+
+    def view(self, request):
+        return HttpResponse(','.join(self.slugs()))
+
+    def test_request_reads_from_replica(self):
+        """Чтение запроса идет в реплику, изменяющий запрос - в основную"""
+        middleware = ReplicaPinningMiddleware(self.view)
+        self.assertEqual(middleware(self.factory.get('/')).content, b'copy')
+        self.assertEqual(middleware(self.factory.post('/')).content, b'main')
+
+    def test_reads_outside_requests_use_primary(self):
+        """Без ReplicaPinningMiddleware чтения идут в основную базу"""
+        self.assertEqual(self.slugs(), ['main'])
+
+    def test_reads_in_transaction_use_primary(self):
+        """Внутри транзакции чтения идут в основную базу"""
+        token = db_router.pin_primary(False)
+        self.addCleanup(db_router.unpin_primary, token)
+        self.assertEqual(self.slugs(), ['copy'])
+        with transaction.atomic():
+            self.assertEqual(self.slugs(), ['main'])
+
+    def test_cached_feeds_read_from_primary(self):
+        """
+        Ленты, которые кэшируются по версии, читаются с основной базы,
+        даже если запросу разрешены чтения с реплики
+        """
+        user = User.objects.create(username='Author')
+        Post.objects.create(text='Пост на основной базе', author=user)
+        cache.clear()
+        for address in (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'Author'}),
+            reverse('posts:api_index'),
+        ):
+            self.assertContains(
+                self.client.get(address), 'Пост на основной базе'
+            )
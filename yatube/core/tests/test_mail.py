@@ -0,0 +1,158 @@
+import socketserver
+import threading
+from io import StringIO
+from smtplib import SMTPException
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import OutgoingEmail
+
+User = get_user_model()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и считает соединения"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250 localhost')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for line in self.rfile:
+                    if line == b'.\r\n':
+                        break
+                self.server.messages += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException('Сервер недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.SpoolEmailBackend',
+    MAIL_SPOOL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class MailSpoolTests(TestCase):
+    def send(self, count=1):
+        for number in range(count):
+            mail.send_mail(
+                f'Тема {number}', 'Текст', 'from@example.com',
+                [f'user{number}@example.com'],
+            )
+
+    def deliver(self, *args):
+        call_command(
+            'send_spooled_mail', '--once', '--rate', '0', *args,
+            stdout=StringIO(),
+        )
+
+    def test_mail_spooled_and_delivered(self):
+        """Письмо ставится в очередь и доставляется командой"""
+        self.send()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+        self.deliver()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Тема 0')
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_message_fields_preserved(self):
+        """Адреса, заголовки, альтернативы и вложения переживают очередь"""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            bcc=['bcc@example.com'], cc=['cc@example.com'],
+            reply_to=['reply@example.com'], headers={'X-Tag': 'yatube'},
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('notes.txt', 'Заметки', 'text/plain')
+        message.attach('data.bin', b'\x00\xff', 'application/octet-stream')
+        message.send()
+        self.deliver()
+        delivered = mail.outbox[0]
+        self.assertIsInstance(delivered, mail.EmailMultiAlternatives)
+        for field in ('subject', 'body', 'from_email', 'to', 'cc', 'bcc',
+                      'reply_to', 'extra_headers', 'alternatives',
+                      'attachments'):
+            with self.subTest(field=field):
+                self.assertEqual(
+                    getattr(delivered, field), getattr(message, field)
+                )
+
+    def test_password_reset_spooled(self):
+        """Сброс пароля не отправляет письмо в запросе"""
+        User.objects.create_user(
+            username='user', email='user@example.com', password='pass'
+        )
+        response = self.client.post(
+            reverse('users:reset_pass'), {'email': 'user@example.com'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            OutgoingEmail.objects.get().recipients, 'user@example.com'
+        )
+
+    @override_settings(
+        MAIL_SPOOL_BACKEND='core.tests.test_mail.FailingBackend'
+    )
+    def test_failed_delivery_retried(self):
+        """Неотправленное письмо остается в очереди для повтора"""
+        self.send()
+        self.deliver()
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(
+            (email.status, email.attempts),
+            (OutgoingEmail.PENDING, 1),
+        )
+        self.assertIn('Сервер недоступен', email.last_error)
+
+    def test_broken_message_rescheduled(self):
+        """Письмо, которое не удалось прочитать, не обрывает пачку"""
+        self.send(2)
+        OutgoingEmail.objects.filter(subject='Тема 0').update(message='{')
+        self.deliver()
+        self.assertEqual(len(mail.outbox), 1)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(
+            (email.subject, email.status), ('Тема 0', OutgoingEmail.PENDING)
+        )
+
+    def test_batch_sent_over_one_smtp_connection(self):
+        """Пачка писем уходит через одно SMTP-соединение"""
+        server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), SMTPHandler
+        )
+        server.daemon_threads = True
+        server.connections = server.messages = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.send(5)
+        with override_settings(
+            MAIL_SPOOL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=server.server_address[1],
+        ):
+            self.deliver('--batch-size', '2')
+        self.assertEqual((server.connections, server.messages), (1, 5))
+        self.assertFalse(OutgoingEmail.objects.exists())
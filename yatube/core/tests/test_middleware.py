@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.staff = User.objects.create(username='Staff', is_staff=True)
+        Post.objects.create(text='Текст поста', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        """Ответ сотруднику содержит показатели запроса в Server-Timing"""
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        response = staff_client.get(reverse('posts:index'))
+        server_timing = response['Server-Timing']
+        for metric in ('db;dur=', 'tpl;dur=', 'cache;desc=', 'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, server_timing)
+
+    def test_server_timing_hidden_from_visitors(self):
+        """Посетителям Server-Timing отдается только по настройке"""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        with self.settings(SERVER_TIMING=True):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+
+    def test_stats_view_staff_only(self):
+        """Сводка по URL доступна только сотрудникам"""
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('core:perf_stats'))
+        self.assertEqual(response.status_code, 302)
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        stats = staff_client.get(reverse('core:perf_stats')).json()
+        self.assertGreaterEqual(stats['posts:index']['requests'], 1)
@@ -0,0 +1,80 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core import db_router
+from core.parallel import run_parallel
+from core.utils import paginate
+from posts.models import Post
+
+User = get_user_model()
+
+
+def thread_name():
+    return threading.current_thread().name
+
+
+@override_settings(VIEW_QUERY_WORKERS=2)
+class RunParallelTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='User')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.user)
+            for number in range(15)
+        )
+
+    def test_functions_run_in_pool(self):
+        """Первая функция выполняется в потоке вызова, остальные в пуле"""
+        first, second = run_parallel(thread_name, thread_name)
+        self.assertEqual(first, thread_name())
+        self.assertTrue(second.startswith('view-queries'))
+
+    def test_context_copied_to_pool(self):
+        """Закрепление за основной базой действует и в потоках пула"""
+        token = db_router.pin_primary(False)
+        self.addCleanup(db_router.unpin_primary, token)
+        _, pinned = run_parallel(thread_name, db_router.primary_pinned)
+        self.assertFalse(pinned)
+
+    @override_settings(VIEW_QUERY_WORKERS=0)
+    def test_disabled_runs_inline(self):
+        """Без VIEW_QUERY_WORKERS функции выполняются по очереди"""
+        self.assertEqual(
+            run_parallel(thread_name, thread_name), [thread_name()] * 2
+        )
+
+    def test_transaction_runs_inline(self):
+        """В транзакции запросы не уходят в другие соединения"""
+        with transaction.atomic():
+            self.assertEqual(
+                run_parallel(thread_name, thread_name), [thread_name()] * 2
+            )
+
+    def test_count_and_page_fetched_together(self):
+        """При пустом кэше COUNT(*) и страница выбираются одновременно"""
+        page = paginate(Post.objects.order_by('pk'), 2)
+        self.assertIsInstance(page.object_list, list)
+        self.assertEqual(page.paginator.count, 15)
+        self.assertEqual(len(page), 5)
+        # Число уже в кэше: выборка остается ленивой.
+        page = paginate(Post.objects.order_by('pk'), 2)
+        self.assertNotIsInstance(page.object_list, list)
+
+    def test_feed_views(self):
+        """Ленты работают при одновременных запросах"""
+        client = Client()
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': 'User'}),
+            {'page': 2},
+        )
+        self.assertEqual(len(response.context['page_obj']), 5)
+        self.assertEqual(response.context['author'].pk, self.user.pk)
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
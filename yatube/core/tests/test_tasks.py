@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_batch, task
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('Сбой')
+
+
+@override_settings(TASKS_EAGER=False, TASKS_RETRY_DELAY=0)
+class TaskQueueTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_after_commit(self):
+        """Задача попадает в очередь только после фиксации транзакции"""
+        with transaction.atomic():
+            remember.delay('значение')
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(Task.objects.count(), 1)
+        call_command('run_tasks', '--once', stdout=StringIO())
+        self.assertEqual(calls, ['значение'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_rolled_back_task_not_enqueued(self):
+        """При откате транзакции задача не ставится в очередь"""
+        try:
+            with transaction.atomic():
+                remember.delay('значение')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+    def test_batching(self):
+        """Обработчик берет задачи пачками в порядке постановки"""
+        for value in range(5):
+            remember.delay(value)
+        self.assertEqual(run_batch(batch_size=3), 3)
+        self.assertEqual(run_batch(batch_size=3), 2)
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+
+    def test_retries_then_fails(self):
+        """Упавшая задача повторяется и после max_attempts помечается FAILED"""
+        explode.delay()
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            run_batch()
+        task_obj = Task.objects.get()
+        self.assertEqual(
+            (task_obj.status, task_obj.attempts), (Task.PENDING, 1)
+        )
+        self.assertIn('Сбой', task_obj.last_error)
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            run_batch()
+        task_obj.refresh_from_db()
+        self.assertEqual(
+            (task_obj.status, task_obj.attempts), (Task.FAILED, 2)
+        )
+        self.assertEqual(run_batch(), 0)
+
+    def test_stale_running_task_reclaimed(self):
+        """Задача упавшего обработчика выдается снова после таймаута"""
+        remember.delay('значение')
+        Task.objects.update(
+            status=Task.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(run_batch(), 1)
+        self.assertEqual(calls, ['значение'])
+
+    def test_stale_task_without_attempts_failed(self):
+        """Зависшая задача на последней попытке не выдается снова"""
+        explode.delay()
+        Task.objects.update(
+            status=Task.RUNNING,
+            attempts=2,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(run_batch(), 0)
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+
+class EagerTaskTests(TransactionTestCase):
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_runs_immediately(self):
+        """В режиме TASKS_EAGER задача выполняется в процессе, без очереди"""
+        calls.clear()
+        remember.delay('значение')
+        self.assertEqual(calls, ['значение'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_waits_for_commit(self):
+        """В режиме TASKS_EAGER задача ждет фиксации, как и в очереди"""
+        calls.clear()
+        with transaction.atomic():
+            remember.delay('зафиксировано')
+            self.assertEqual(calls, [])
+        try:
+            with transaction.atomic():
+                remember.delay('отменено')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(calls, ['зафиксировано'])
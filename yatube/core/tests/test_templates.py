@@ -0,0 +1,39 @@
+from copy import deepcopy
+
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from core.template_backend import warm_templates
+
+CACHED_TEMPLATES = deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['APP_DIRS'] = False
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class WarmTemplatesTests(SimpleTestCase):
+    def test_templates_cached_after_warmup(self):
+        """Прогрев кладет базовый шаблон и включения в кэш загрузчика"""
+        names = warm_templates()
+        loader = engines.all()[0].engine.template_loaders[0]
+        for name in (
+            'base.html',
+            'includes/header.html',
+            'posts/includes/paginator.html',
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+                self.assertIn(name, loader.get_template_cache)
+
+    def test_app_templates_warmed(self):
+        """Прогреваются и шаблоны из каталогов templates/ приложений"""
+        names = warm_templates()
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertIn('admin/base.html', names)
+        self.assertIn('admin/base.html', loader.get_template_cache)
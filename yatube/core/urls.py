@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+
+app_name = 'core'
+urlpatterns = [
+    path('stats/', views.perf_stats, name='perf_stats'),
+    path('slow-queries/', views.slow_queries, name='slow_queries'),
+]
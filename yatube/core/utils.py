@@ -1,11 +1,33 @@
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from core.parallel import parallel_enabled, run_parallel
+
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
 
 
-def paginate(queryset, page, count=10):
+def paginate(queryset, page, count=10, cursor=None):
     """
-    Функция для разбивки объектов запроса на страницы
+    Функция для разбивки объектов запроса на страницы.
+    Если передан курсор, используется постраничный вывод по ключу
+    (pub_date, id) без COUNT(*) и OFFSET; пустой курсор - первая
+    страница такого вывода.
     """
-    paginator = Paginator(queryset, count)
+    if cursor is not None:
+        return paginate_cursor(queryset, cursor, count)
+
+    paginator = CachedCountPaginator(queryset, count)
+    prefetched = _prefetch_page(paginator, page)
 
     try:
         results = paginator.page(page)
@@ -14,4 +36,237 @@ def paginate(queryset, page, count=10):
     except EmptyPage:
         results = paginator.page(paginator.num_pages)
 
+    if prefetched is not None and prefetched[0] == results.number:
+        results.object_list = prefetched[1]
     return results
+
+
+def _prefetch_page(paginator, page):
+    """
+    Если числа объектов нет в кэше, COUNT(*) и выборка запрошенной
+    страницы выполняются одновременно. Возвращает (номер, объекты)
+    или None, если выборка остается ленивой.
+    """
+    if not parallel_enabled() or paginator.count_cached():
+        return None
+    try:
+        number = int(page or 1)
+    except (TypeError, ValueError):
+        return None
+    if number < 1:
+        return None
+    bottom = (number - 1) * paginator.per_page
+    top = bottom + paginator.per_page
+    rows, _ = run_parallel(
+        lambda: list(paginator.object_list[bottom:top]),
+        lambda: paginator.count,
+    )
+    return number, rows
+
+
+def _count_version_key(model):
+    return f'count_version:{model._meta.label_lower}'
+
+
+def invalidate_counts(model):
+    """Сбрасывает закэшированные количества объектов модели"""
+    key = _count_version_key(model)
+    cache.add(key, 1, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ключ вытеснен из кэша между add и incr.
+        cache.set(key, 1, None)
+
+
+def estimate_count(queryset):
+    """
+    Оценивает число строк нефильтрованного запроса по статистике
+    базы данных. Возвращает None, если оценка недоступна.
+    """
+    if queryset.query.where or queryset.query.distinct:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [table],
+            )
+        elif connection.vendor == 'sqlite':
+            # sqlite_stat1 появляется только после ANALYZE.
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table],
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    if estimate < settings.PAGINATOR_ESTIMATE_THRESHOLD:
+        # На небольших таблицах точный подсчет дешев, а оценка неточна.
+        return None
+    return estimate
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который берет общее число объектов из кэша или из
+    статистики базы данных вместо COUNT(*) на каждый запрос.
+    Кэш сбрасывается по таймауту или через invalidate_counts().
+    """
+
+    @cached_property
+    def _count_key(self):
+        queryset = self.object_list
+        version = cache.get(_count_version_key(queryset.model), 1)
+        query_hash = hashlib.md5(str(queryset.query).encode()).hexdigest()
+        return (
+            f'count:{queryset.model._meta.label_lower}:{version}:{query_hash}'
+        )
+
+    def count_cached(self):
+        """Есть ли число объектов в кэше (COUNT(*) не понадобится)"""
+        if not isinstance(self.object_list, QuerySet):
+            return True
+        return (
+            'count' in self.__dict__
+            or cache.get(self._count_key) is not None
+        )
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        key = self._count_key
+        total = cache.get(key)
+        if total is None:
+            total = estimate_count(queryset)
+            if total is None:
+                total = queryset.count()
+            cache.set(key, total, settings.PAGINATOR_COUNT_TIMEOUT)
+        return total
+
+
+def encode_cursor(direction, pub_date, pk):
+    """Упаковывает позицию (pub_date, id) в строку для URL."""
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(cursor):
+    """
+    Распаковывает курсор в кортеж (direction, pub_date, id).
+    Для некорректного курсора возвращает None.
+    """
+    try:
+        raw = urlsafe_base64_decode(cursor).decode()
+        direction, pub_date, pk = raw.split('|')
+        if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS):
+            return None
+        return direction, datetime.fromisoformat(pub_date), int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def _position(obj):
+    """Ключ сортировки объекта: модель или словарь из values()."""
+    if isinstance(obj, dict):
+        return obj['pub_date'], obj['id']
+    return obj.pub_date, obj.pk
+
+
+class CursorPage:
+    """Страница постраничного вывода по курсору"""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_position=None,
+                 previous_position=None):
+        self.object_list = object_list
+        self.next_cursor = (
+            encode_cursor(CURSOR_NEXT, *next_position)
+            if next_position else None
+        )
+        self.previous_cursor = (
+            encode_cursor(CURSOR_PREVIOUS, *previous_position)
+            if previous_position else None
+        )
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_cursor(queryset, cursor, count=10):
+    """
+    Возвращает страницу из count объектов после (или перед) позицией
+    курсора. Использует индекс по (pub_date, id), поэтому время ответа
+    не зависит от глубины страницы.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    ordered = queryset.order_by('-pub_date', '-pk')
+    if position is None:
+        rows = list(ordered[:count + 1])
+        return CursorPage(
+            rows[:count],
+            next_position=_position(rows[count - 1])
+            if len(rows) > count else None,
+        )
+
+    direction, pub_date, pk = position
+    rows = list(keyset_filter(queryset, direction, pub_date, pk)[:count + 1])
+    has_more = len(rows) > count
+    rows = rows[:count]
+    if direction == CURSOR_NEXT:
+        return CursorPage(
+            rows,
+            next_position=_position(rows[-1]) if has_more else None,
+            previous_position=_position(rows[0]) if rows else None,
+        )
+
+    rows = rows[::-1]
+    return CursorPage(
+        rows,
+        next_position=_position(rows[-1]) if rows else None,
+        previous_position=_position(rows[0]) if has_more else None,
+    )
+
+
+def keyset_filter(queryset, direction, pub_date, pk):
+    """
+    Отбирает записи после позиции (pub_date, id) в порядке ленты
+    или, для направления назад, перед ней в обратном порядке.
+    """
+    # Условие записано как диапазон по pub_date, чтобы база данных
+    # читала индекс с позиции курсора и останавливалась на LIMIT.
+    if direction == CURSOR_NEXT:
+        return queryset.order_by('-pub_date', '-pk').filter(
+            pub_date__lte=pub_date
+        ).exclude(pub_date=pub_date, pk__gte=pk)
+    return queryset.order_by('pub_date', 'pk').filter(
+        pub_date__gte=pub_date
+    ).exclude(pub_date=pub_date, pk__lte=pk)
@@ -0,0 +1,24 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from core import perf
+from core.db import slow_query_log
+
+
+@staff_member_required
+def perf_stats(request):
+    """Сводка показателей производительности по URL текущего процесса"""
+    return JsonResponse(
+        perf.rolling_stats.snapshot(),
+        json_dumps_params={'ensure_ascii': False, 'indent': 2},
+    )
+
+
+@staff_member_required
+def slow_queries(request):
+    """Медленные запросы текущего процесса, сгруппированные по отпечатку"""
+    return JsonResponse(
+        slow_query_log.snapshot(),
+        safe=False,
+        json_dumps_params={'ensure_ascii': False, 'indent': 2},
+    )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from .models import Follow, Post, Group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -20,5 +20,13 @@ class GroupAdmin(admin.ModelAdmin):
     search_fields = ('title',)
 
 
+class FollowAdmin(admin.ModelAdmin):
+    """Класс кастомизации модели Follow"""
+
+    list_display = ('pk', 'user', 'author', 'created',)
+    raw_id_fields = ('user', 'author',)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
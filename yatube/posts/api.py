@@ -0,0 +1,175 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from . import authors, feed_cache, groups
+from .models import Post
+from core.db_router import primary
+from core.utils import paginate_cursor
+
+
+# Поле ответа API -> выражение для values().
+API_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+# Поля, нужные курсору независимо от выбранных клиентом.
+CURSOR_FIELDS = ('id', 'pub_date')
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая отдается клиенту в виде JSON"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _error(message, status=400):
+    return JsonResponse(
+        {'error': message}, status=status,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def selected_fields(request):
+    """Поля из параметра fields; по умолчанию все поля API"""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(API_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(unknown)}; '
+            f'доступны: {", ".join(API_FIELDS)}'
+        )
+    return fields
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit должен быть целым числом')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _values(queryset, fields):
+    lookups = {API_FIELDS[field] for field in fields}
+    lookups.update(CURSOR_FIELDS)
+    return queryset.values(*lookups)
+
+
+def _serialize(row, fields):
+    return {field: row[API_FIELDS[field]] for field in fields}
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def conditional_json(request, scope, ident, build):
+    """
+    Отвечает 304 по ETag/Last-Modified версии ленты, иначе отдает
+    данные build() из кэша или строит их заново.
+    """
+    version, modified = feed_cache.feed_state(scope, ident)
+    etag = quote_etag(hashlib.md5(
+        f'api:{request.path}:{version}:{request.GET.urlencode()}'.encode()
+    ).hexdigest())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=modified
+    )
+    if response is None:
+        key = f'api_response:{etag}'
+        data = cache.get(key)
+        if data is None:
+            try:
+                # Данные кэшируются под текущей версией ленты и читаются
+                # с основной базы: реплика может еще не видеть изменений.
+                with primary():
+                    data = build()
+            except ApiError as error:
+                return _error(str(error), error.status)
+            cache.set(key, data, settings.FEED_CACHE_TIMEOUT)
+        response = JsonResponse(data, json_dumps_params={
+            'ensure_ascii': False,
+        })
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    return response
+
+
+def _feed(request, scope, ident, queryset):
+    def build():
+        fields = selected_fields(request)
+        page = paginate_cursor(
+            _values(queryset, fields), request.GET.get('cursor'),
+            _limit(request),
+        )
+        return {
+            'results': [_serialize(row, fields) for row in page],
+            'next': _page_url(request, page.next_cursor),
+            'previous': _page_url(request, page.previous_cursor),
+        }
+    return conditional_json(request, scope, ident, build)
+
+
+@require_safe
+def index(request):
+    """Лента всех публикаций"""
+    return _feed(request, feed_cache.INDEX, '', Post.objects.all())
+
+
+@require_safe
+def group_posts(request, slug):
+    """Лента публикаций группы"""
+    group = groups.get_by_slug(slug)
+    if group is None:
+        return _error('Группа не найдена', status=404)
+    return _feed(
+        request, feed_cache.GROUP, slug,
+        Post.objects.filter(group_id=group.id),
+    )
+
+
+@require_safe
+def profile(request, username):
+    """Лента публикаций автора"""
+    author = authors.get_by_username(username)
+    if author is None:
+        return _error('Автор не найден', status=404)
+    return _feed(
+        request, feed_cache.AUTHOR, username,
+        Post.objects.filter(author_id=author.id),
+    )
+
+
+@require_safe
+def post_detail(request, post_id):
+    """Публикация по id"""
+    def build():
+        fields = selected_fields(request)
+        row = _values(Post.objects.filter(pk=post_id), fields).first()
+        if row is None:
+            raise ApiError('Публикация не найдена', status=404)
+        return _serialize(row, fields)
+    # Любое изменение публикации меняет версию общей ленты.
+    return conditional_json(request, feed_cache.INDEX, '', build)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .models import AuthorStats
+
+
+User = get_user_model()
+
+FIELDS = ('id', 'username', 'first_name', 'last_name')
+
+
+def _id_key(author_id):
+    return f'author:id:{author_id}'
+
+
+def _username_key(username):
+    return f'author:username:{username}'
+
+
+def _build(data):
+    """
+    Облегченный объект автора: User только с полями для шаблонов
+    (остальные поля отложены) и числом публикаций в post_count.
+    """
+    author = User.from_db(
+        'default', FIELDS, [data[field] for field in FIELDS]
+    )
+    author.post_count = data['post_count']
+    return author
+
+
+def _load(**lookup):
+    """Читает автора из БД и кладет запись в кэш"""
+    data = User.objects.filter(**lookup).values(*FIELDS).first()
+    if data is None:
+        return None
+    data['post_count'] = AuthorStats.objects.post_count(data['id'])
+    cache.set_many({
+        _id_key(data['id']): data,
+        _username_key(data['username']): data['id'],
+    }, settings.AUTHOR_CACHE_TIMEOUT)
+    return _build(data)
+
+
+def get_by_id(author_id):
+    """Автор по id или None"""
+    data = cache.get(_id_key(author_id))
+    if data is not None:
+        return _build(data)
+    return _load(pk=author_id)
+
+
+def get_by_username(username):
+    """Автор по имени пользователя или None"""
+    author_id = cache.get(_username_key(username))
+    if author_id is not None:
+        author = get_by_id(author_id)
+        # Имя пользователя могло смениться после записи в кэш.
+        if author is not None and author.username == username:
+            return author
+    return _load(username=username)
+
+
+def invalidate(author_id, *usernames):
+    """Удаляет запись автора и ссылки на нее по именам из кэша"""
+    keys = [_id_key(author_id)]
+    keys.extend(_username_key(username) for username in usernames)
+    cache.delete_many(keys)
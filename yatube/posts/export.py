@@ -0,0 +1,54 @@
+import csv
+import json
+
+from .models import Post
+
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author__username', 'group__slug')
+EXPORT_HEADERS = ('id', 'text', 'pub_date', 'author', 'group')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_queryset(group=None, author=None, date_from=None, date_to=None):
+    """Строки публикаций для выгрузки с учетом фильтров"""
+    queryset = Post.objects.order_by('pk')
+    if group:
+        queryset = queryset.filter(group__slug=group)
+    if author:
+        queryset = queryset.filter(author__username=author)
+    if date_from:
+        queryset = queryset.filter(pub_date__date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(pub_date__date__lte=date_to)
+    return queryset.values_list(*EXPORT_FIELDS)
+
+
+class _Line:
+    """Буфер для csv.writer, который возвращает записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(queryset, file_format='jsonl', chunk_size=2000):
+    """
+    Генератор строк выгрузки. Записи читаются из базы порциями
+    по chunk_size, поэтому расход памяти не зависит от размера таблицы.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    if file_format == 'csv':
+        writer = csv.writer(_Line())
+        yield writer.writerow(EXPORT_HEADERS)
+        for row in rows:
+            yield writer.writerow(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            )
+        return
+    for row in rows:
+        record = dict(zip(EXPORT_HEADERS, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
@@ -0,0 +1,77 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+INDEX = 'index'
+GROUP = 'group'
+AUTHOR = 'author'
+
+
+def _version_key(scope, ident):
+    return f'feed_version:{scope}:{ident}'
+
+
+def _modified_key(scope, ident):
+    return f'feed_modified:{scope}:{ident}'
+
+
+def _new_version(scope, ident):
+    """Заводит версию ленты, которой нет в кэше, и возвращает ее"""
+    version = uuid4().hex
+    if cache.add(_version_key(scope, ident), version, None):
+        cache.set(_modified_key(scope, ident), int(time.time()), None)
+        return version
+    return cache.get(_version_key(scope, ident), version)
+
+
+def feed_version(scope, ident=''):
+    """Текущая версия кэша ленты"""
+    version = cache.get(_version_key(scope, ident))
+    if version is None:
+        version = _new_version(scope, ident)
+    return version
+
+
+def feed_state(scope, ident=''):
+    """
+    Версия ленты и время ее последнего изменения (timestamp или None,
+    если время вытеснено из кэша).
+    """
+    version_key = _version_key(scope, ident)
+    modified_key = _modified_key(scope, ident)
+    values = cache.get_many((version_key, modified_key))
+    if version_key not in values:
+        return _new_version(scope, ident), cache.get(modified_key)
+    return values[version_key], values.get(modified_key)
+
+
+def bump(scope, *idents):
+    """
+    Меняет версии лент, делая их закэшированные страницы устаревшими.
+    Без idents сбрасывается общая лента scope. Версия случайная, а не
+    счетчик: после очистки кэша ETag не совпадет с выданным до изменения.
+    """
+    for ident in idents or ('',):
+        cache.set_many({
+            _version_key(scope, ident): uuid4().hex,
+            _modified_key(scope, ident): int(time.time()),
+        }, None)
+
+
+def feed_cache_context(request, page_obj, scope, ident=''):
+    """
+    Ключ и таймаут кэша фрагмента ленты для тега {% cache %}.
+    Ключ включает версию ленты и номер страницы или курсор.
+    """
+    if getattr(page_obj, 'is_cursor', False):
+        page = f"cursor:{request.GET.get('cursor', '')}"
+    else:
+        page = page_obj.number
+    version = feed_version(scope, ident)
+    return {
+        'feed_cache_key': f'{scope}:{ident}:{version}:{page}',
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
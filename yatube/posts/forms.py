@@ -1,9 +1,40 @@
 from django import forms
 
-from .models import Post
+from .groups import GroupChoiceIterator, GroupQuerySet, get_by_id
+from .models import Group, Post
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group_field = self.fields['group']
+        # Поле остается ModelChoiceField: выбранная группа проверяется
+        # по реестру через его выборку, варианты тоже берутся из реестра.
+        group_field.queryset = GroupQuerySet(Group)
+        group_field.iterator = GroupChoiceIterator
+        group_field.widget.choices = group_field.choices
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        group = self.cleaned_data.get('group')
+        if group is not None and get_by_id(group.pk) is group:
+            # Группа найдена в реестре: повторная проверка внешнего ключа
+            # моделью означала бы лишний запрос к БД.
+            exclude.append('group')
+        return exclude
+
+
+class ExportFilterForm(forms.Form):
+    """Фильтры выгрузки публикаций"""
+    group = forms.SlugField(required=False)
+    author = forms.CharField(required=False)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    format = forms.ChoiceField(
+        choices=(('jsonl', 'JSONL'), ('csv', 'CSV')),
+        required=False,
+    )
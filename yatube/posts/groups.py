@@ -0,0 +1,107 @@
+import threading
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.forms.models import ModelChoiceIterator
+
+from .models import Group
+
+
+VERSION_KEY = 'groups:version'
+FIELDS = ('id', 'title', 'slug', 'description')
+
+
+class _Registry:
+    """Снимок групп одной версии с индексами по slug и id"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.groups = [Group.from_db('default', FIELDS, row) for row in rows]
+        self.by_slug = {group.slug: group for group in self.groups}
+        self.by_id = {group.pk: group for group in self.groups}
+
+
+_local = threading.local()
+
+
+def _registry():
+    """
+    Актуальный снимок групп. В каждом потоке он живет до смены версии в
+    общем кэше, а другие потоки и процессы берут данные из общего кэша,
+    а не из БД.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Версия случайная, а не счетчик: после вытеснения ключа из
+        # кэша процессы не примут старый снимок за актуальный.
+        cache.add(VERSION_KEY, uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    registry = getattr(_local, 'registry', None)
+    if registry is not None and registry.version == version:
+        return registry
+    data_key = f'groups:data:{version}'
+    rows = cache.get(data_key)
+    if rows is None:
+        # Снимок читается с основной БД: реплика может отставать.
+        rows = list(
+            Group.objects.using('default').order_by('pk')
+            .values_list(*FIELDS)
+        )
+        cache.set(data_key, rows, settings.GROUPS_CACHE_TIMEOUT)
+    _local.registry = _Registry(version, rows)
+    return _local.registry
+
+
+def all_groups():
+    """Все группы в порядке создания"""
+    return _registry().groups
+
+
+def get_by_slug(slug):
+    """Группа по слагу или None"""
+    return _registry().by_slug.get(slug)
+
+
+def get_by_id(group_id):
+    """Группа по id или None"""
+    return _registry().by_id.get(group_id)
+
+
+def invalidate():
+    """Сбрасывает реестр групп во всех процессах"""
+    cache.set(VERSION_KEY, uuid4().hex, None)
+
+
+class GroupChoiceIterator(ModelChoiceIterator):
+    """Варианты выбора группы из реестра без запроса к БД"""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for group in all_groups():
+            yield self.choice(group)
+
+    def __len__(self):
+        return len(all_groups()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(all_groups())
+
+
+class GroupQuerySet(models.QuerySet):
+    """
+    Выборка групп для поля формы: ModelChoiceField ищет выбранную группу
+    через get(id=...), и она берется из реестра. Группа, которой еще нет
+    в снимке, ищется одним запросом к БД.
+    """
+
+    def get(self, *args, **kwargs):
+        pk_names = ('pk', self.model._meta.pk.attname)
+        if not args and not self.query.where and len(kwargs) == 1:
+            (name, value), = kwargs.items()
+            group = get_by_id(int(value)) if name in pk_names else None
+            if group is not None:
+                return group
+        return super().get(*args, **kwargs)
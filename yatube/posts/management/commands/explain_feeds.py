@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.utils import CURSOR_NEXT, estimate_count, keyset_filter
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+
+class _Captured(Exception):
+    """Прерывает запрос, SQL которого уже записан"""
+
+
+def capture_sql(func):
+    """SQL и параметры первого запроса func; сам запрос не выполняется"""
+    captured = []
+
+    def wrapper(execute, sql, params, many, context):
+        captured.append((sql, params))
+        raise _Captured
+
+    with connection.execute_wrapper(wrapper):
+        try:
+            func()
+        except _Captured:
+            pass
+    return captured[0]
+
+
+class Command(BaseCommand):
+    help = 'Выводит планы выполнения (EXPLAIN) запросов всех лент'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='EXPLAIN ANALYZE (только PostgreSQL)',
+        )
+        parser.add_argument('--per-page', type=int, default=10)
+        parser.add_argument('--page', type=int, default=100)
+
+    def feed_queries(self, per_page, page):
+        """
+        Запросы, которые выполняют вью лент: число постов для
+        пагинатора и страница ленты
+        """
+        username = User.objects.order_by('pk').values_list(
+            'username', flat=True
+        ).first() or ''
+        slug = Group.objects.order_by('pk').values_list(
+            'slug', flat=True
+        ).first() or ''
+        offset = (page - 1) * per_page
+        feeds = {
+            'index': Post.objects.feed(),
+            'group': Post.objects.feed().filter(group__slug=slug),
+            'profile': Post.objects.feed().filter(author__username=username),
+        }
+
+        queries = {}
+        for name, feed in feeds.items():
+            # Число постов в большой таблице без фильтров пагинатор
+            # берет из статистики БД, и COUNT(*) не выполняется.
+            if estimate_count(feed) is None:
+                queries[f'{name}: count'] = capture_sql(feed.count)
+            page_queryset = feed[offset:offset + per_page]
+            queries[f'{name}: page'] = capture_sql(
+                lambda: list(page_queryset)
+            )
+        last = Post.objects.order_by('-pub_date', '-pk').first()
+        if last:
+            cursor_page = keyset_filter(
+                feeds['index'], CURSOR_NEXT, last.pub_date, last.pk
+            )[:per_page + 1]
+            queries['index: cursor page'] = capture_sql(
+                lambda: list(cursor_page)
+            )
+        return queries
+
+    @staticmethod
+    def explain(sql, params, options):
+        prefix = connection.ops.explain_query_prefix(**options)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                self.stderr.write(
+                    'EXPLAIN ANALYZE доступен только в PostgreSQL'
+                )
+            else:
+                explain_options['analyze'] = True
+
+        queries = self.feed_queries(options['per_page'], options['page'])
+        for name, (sql, params) in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'{sql} {params}')
+            self.stdout.write(self.explain(sql, params, explain_options))
+            self.stdout.write('')
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import export_lines, export_queryset
+from posts.forms import ExportFilterForm
+
+
+class Command(BaseCommand):
+    help = 'Выгружает публикации в JSONL или CSV потоком'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            default='jsonl')
+        parser.add_argument('--output', help='Файл, по умолчанию stdout')
+        parser.add_argument('--group', help='Слаг группы')
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument('--date-from', help='ГГГГ-ММ-ДД')
+        parser.add_argument('--date-to', help='ГГГГ-ММ-ДД')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        form = ExportFilterForm({
+            key: options[key] for key in (
+                'group', 'author', 'date_from', 'date_to', 'format'
+            ) if options[key]
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        filters = form.cleaned_data
+        file_format = filters.pop('format')
+        lines = export_lines(
+            export_queryset(**filters), file_format, options['chunk_size']
+        )
+        if options['output']:
+            with open(
+                options['output'], 'w', newline='', encoding='utf-8'
+            ) as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
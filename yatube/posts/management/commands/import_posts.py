@@ -0,0 +1,166 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.utils import invalidate_counts
+from posts import authors, feed_cache, tasks
+from posts.forms import PostForm
+from posts.models import AuthorStats, Group, Post
+from posts.search import get_backend
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует публикации из JSONL или CSV с полями text, author '
+        '(username) и group (slug) пачками через bulk_create'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла, по умолчанию определяется по расширению',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с номером последней загруженной строки '
+                 '(по умолчанию <path>.checkpoint)',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с позиции из файла checkpoint',
+        )
+
+    def read_rows(self, path, file_format):
+        with open(path, newline='', encoding='utf-8') as source:
+            if file_format == 'csv':
+                yield from csv.DictReader(source)
+                return
+            for line in source:
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError as error:
+                        yield {'_error': f'некорректный JSON: {error}'}
+                        continue
+                    if not isinstance(row, dict):
+                        row = {'_error': 'строка должна быть объектом JSON'}
+                    yield row
+
+    def build_post(self, row, authors, groups):
+        """Проверяет строку по правилам PostForm и создает объект Post"""
+        if '_error' in row:
+            raise ValidationError(row['_error'])
+        text = PostForm.base_fields['text'].clean(row.get('text'))
+        author_id = authors.get(row.get('author'))
+        if author_id is None:
+            raise ValidationError(f'нет автора {row.get("author")!r}')
+        slug = row.get('group') or None
+        group_id = None
+        if slug is not None:
+            group_id = groups.get(slug)
+            if group_id is None:
+                raise ValidationError(f'нет группы {slug!r}')
+        return Post(text=text, author_id=author_id, group_id=group_id)
+
+    def write_batch(self, batch):
+        """Сохраняет пачку и обновляет производные данные постов"""
+        with transaction.atomic():
+            last_pk = Post.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ).first() or 0
+            Post.objects.bulk_create(batch)
+            # bulk_create не отправляет сигналы, поэтому счетчики,
+            # поисковый индекс и ленты подписчиков обновляются здесь.
+            for author_id, count in Counter(
+                post.author_id for post in batch
+            ).items():
+                AuthorStats.objects.change_post_count(author_id, count)
+            created = Post.objects.filter(pk__gt=last_pk)
+            get_backend().index_queryset(created)
+            tasks.fan_out_posts.delay(
+                list(created.values_list('pk', flat=True))
+            )
+        invalidate_counts(Post)
+        usernames = dict(User.objects.filter(
+            pk__in={post.author_id for post in batch}
+        ).values_list('pk', 'username'))
+        # Записи авторов хранят число публикаций.
+        for author_id, username in usernames.items():
+            authors.invalidate(author_id, username)
+        feed_cache.bump(feed_cache.INDEX)
+        feed_cache.bump(feed_cache.AUTHOR, *usernames.values())
+        group_ids = {post.group_id for post in batch} - {None}
+        if group_ids:
+            feed_cache.bump(feed_cache.GROUP, *Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True))
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        start = 0
+        if options['resume'] and os.path.exists(checkpoint):
+            with open(checkpoint) as checkpoint_file:
+                start = int(checkpoint_file.read() or 0)
+            self.stdout.write(f'Продолжаем со строки {start + 1}')
+
+        authors = dict(User.objects.values_list('username', 'pk'))
+        groups = dict(Group.objects.values_list('slug', 'pk'))
+
+        batch_size = options['batch_size']
+        batch = []
+        imported = rejected = 0
+        started = time.perf_counter()
+        position = 0
+        for position, row in enumerate(
+            self.read_rows(path, file_format), start=1
+        ):
+            if position <= start:
+                continue
+            try:
+                batch.append(self.build_post(row, authors, groups))
+            except ValidationError as error:
+                rejected += 1
+                self.stderr.write(
+                    f'Строка {position} отклонена: {"; ".join(error.messages)}'
+                )
+            if len(batch) >= batch_size:
+                self.write_batch(batch)
+                imported += len(batch)
+                batch = []
+                self.save_checkpoint(checkpoint, position)
+        if batch:
+            self.write_batch(batch)
+            imported += len(batch)
+        self.save_checkpoint(checkpoint, max(position, start))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Загружено: {imported}, отклонено: {rejected}, '
+            f'{elapsed:.1f} с, {imported / elapsed if elapsed else 0:.0f} '
+            f'строк/с'
+        )
+
+    @staticmethod
+    def save_checkpoint(checkpoint, position):
+        # Позиция записывается после коммита пачки, поэтому при сбое
+        # повторно загружается не больше одной пачки.
+        with open(checkpoint, 'w') as checkpoint_file:
+            checkpoint_file.write(str(position))
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.models import AuthorStats
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики публикаций и подписчиков авторов '
+        'и исправляет расхождения'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        author_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        fixed = 0
+        batch = []
+        for author_id in author_ids.iterator():
+            batch.append(author_id)
+            if len(batch) == batch_size:
+                fixed += AuthorStats.objects.reconcile(batch)
+                batch = []
+        if batch:
+            fixed += AuthorStats.objects.reconcile(batch)
+        self.stdout.write(f'Исправлено счетчиков: {fixed}')
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 
 
@@ -15,6 +17,25 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    """Запросы публикаций для лент"""
+
+    def feed(self):
+        """
+        Подгружает автора и группу одним запросом и не выбирает
+        поля, которые не выводятся в ленте
+        """
+        return self.select_related('author', 'group').only(
+            'text',
+            'pub_date',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'group__title',
+            'group__slug',
+        )
+
+
 class Post(models.Model):
     """Модель публикаций"""
     text = models.TextField(
@@ -41,8 +62,182 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост'
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'), name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'), name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date'), name='post_group_pub_date_idx'
+            ),
+        )
 
     def __str__(self) -> str:
-        return self.text[:15]   
+        return self.text[:15]
+
+
+class AuthorStatsManager(models.Manager):
+    def post_count(self, author_id):
+        """Возвращает число публикаций автора без COUNT(*) по постам"""
+        post_count = self.filter(author_id=author_id).values_list(
+            'post_count', flat=True
+        ).first()
+        if post_count is None:
+            stats, _ = self.get_or_create(
+                author_id=author_id,
+                defaults={
+                    'post_count': Post.objects.filter(
+                        author_id=author_id
+                    ).count(),
+                    'follower_count': Follow.objects.filter(
+                        author_id=author_id
+                    ).count(),
+                },
+            )
+            post_count = stats.post_count
+        return post_count
+
+    def change_post_count(self, author_id, delta, create=True):
+        """
+        Атомарно меняет счетчик публикаций автора на delta; счетчик,
+        разошедшийся с таблицей постов, не уходит ниже нуля.
+        """
+        with transaction.atomic():
+            updated = self.filter(author_id=author_id).update(
+                post_count=Greatest(F('post_count') + delta, 0)
+            )
+            if not updated and create:
+                # Счетчика еще нет: считаем его по таблице постов,
+                # в которой изменение уже учтено.
+                self.post_count(author_id)
+
+    def follower_count(self, author_id):
+        """Число подписчиков автора по счетчику"""
+        return self.filter(author_id=author_id).values_list(
+            'follower_count', flat=True
+        ).first() or 0
+
+    def change_follower_count(self, author_id, delta, create=True):
+        """
+        Атомарно меняет счетчик подписчиков автора на delta, не ниже нуля
+        """
+        with transaction.atomic():
+            updated = self.filter(author_id=author_id).update(
+                follower_count=Greatest(F('follower_count') + delta, 0)
+            )
+            if not updated and create:
+                self.get_or_create(
+                    author_id=author_id,
+                    defaults={
+                        'post_count': Post.objects.filter(
+                            author_id=author_id
+                        ).count(),
+                        'follower_count': Follow.objects.filter(
+                            author_id=author_id
+                        ).count(),
+                    },
+                )
+
+    def reconcile(self, author_ids):
+        """
+        Пересчитывает счетчики для списка авторов и исправляет
+        расхождения. Возвращает число исправленных записей.
+        """
+        posts = dict.fromkeys(author_ids, 0)
+        posts.update(
+            Post.objects.filter(author_id__in=author_ids)
+            .order_by()
+            .values_list('author_id')
+            .annotate(post_count=Count('pk'))
+        )
+        followers = dict(
+            Follow.objects.filter(author_id__in=author_ids)
+            .order_by()
+            .values_list('author_id')
+            .annotate(follower_count=Count('pk'))
+        )
+        existing = self.in_bulk(author_ids)
+        to_update = []
+        to_create = []
+        for author_id, post_count in posts.items():
+            follower_count = followers.get(author_id, 0)
+            stats = existing.get(author_id)
+            if stats is None:
+                to_create.append(self.model(
+                    author_id=author_id,
+                    post_count=post_count,
+                    follower_count=follower_count,
+                ))
+            elif (stats.post_count, stats.follower_count) != (
+                post_count, follower_count
+            ):
+                stats.post_count = post_count
+                stats.follower_count = follower_count
+                to_update.append(stats)
+        with transaction.atomic():
+            self.bulk_create(to_create, ignore_conflicts=True)
+            self.bulk_update(to_update, ('post_count', 'follower_count'))
+        return len(to_create) + len(to_update)
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счетчики автора"""
+    author = models.OneToOneField(
+        User,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество публикаций'
+    )
+    follower_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+
+    objects = AuthorStatsManager()
+
+    def __str__(self):
+        return f'{self.author_id}: {self.post_count}'
+
+
+class Follow(models.Model):
+    """Модель подписок на авторов"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата подписки'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=F('author')), name='no_self_follow'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
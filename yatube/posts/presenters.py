@@ -0,0 +1,79 @@
+from urllib.parse import quote
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, reverse
+from django.utils.functional import cached_property
+from django.utils.http import RFC3986_SUBDELIMS
+
+
+# Значение, подходящее под конвертеры int, slug и str; по нему адрес
+# разрезается на префикс и суффикс.
+_MARKER = '9999999999'
+_SAFE = RFC3986_SUBDELIMS + '/~:@'
+
+_templates = {}
+
+
+@receiver(setting_changed)
+def clear_url_templates(**kwargs):
+    _templates.clear()
+
+
+def url_for(name, value):
+    """
+    Адрес по имени URL с одним аргументом. Разворачивает URL один раз
+    на процесс и префикс скрипта, дальше только склеивает строки.
+    """
+    key = (name, get_script_prefix())
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = tuple(
+            reverse(name, args=[_MARKER]).rsplit(_MARKER, 1)
+        )
+    prefix, suffix = template
+    return prefix + quote(str(value), safe=_SAFE) + suffix
+
+
+class FeedItem:
+    """Публикация в ленте с готовыми для шаблона значениями и ссылками"""
+
+    __slots__ = (
+        'pk', 'text', 'pub_date', 'author_name', 'author_url',
+        'detail_url', 'group_title', 'group_url',
+    )
+
+    def __init__(self, post):
+        self.pk = post.pk
+        self.text = post.text
+        self.pub_date = post.pub_date
+        self.author_name = post.author.get_full_name()
+        self.author_url = url_for('posts:profile', post.author.username)
+        self.detail_url = url_for('posts:post_detail', post.pk)
+        self.group_title = self.group_url = ''
+        if post.group is not None:
+            self.group_title = post.group.title
+            self.group_url = url_for('posts:group_list', post.group.slug)
+
+
+class FeedPage:
+    """
+    Элементы страницы ленты. Строятся при первом обходе, поэтому при
+    попадании в кэш фрагмента запросы к базе не выполняются.
+    """
+
+    def __init__(self, page_obj):
+        self.page_obj = page_obj
+
+    @cached_property
+    def items(self):
+        return [FeedItem(post) for post in self.page_obj]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
@@ -0,0 +1,241 @@
+from django.conf import settings
+from django.db import connection
+
+from .models import Post
+
+
+class SearchResults:
+    """
+    Результаты поиска в порядке релевантности. Поддерживает count() и
+    срезы, поэтому передается в paginate() как обычный QuerySet.
+    """
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop - offset) if key.stop is not None else None
+        ids = self.backend.ranked_ids(self.query, offset, limit)
+        posts = Post.objects.feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class SimpleSearchBackend:
+    """Поиск через LIKE для баз данных без полнотекстового индекса"""
+
+    def index(self, post_id, text):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def index_queryset(self, queryset):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def _queryset(self, query):
+        queryset = Post.objects.all()
+        for word in query.split():
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+
+    def count(self, query):
+        return self._queryset(query).count()
+
+    def ranked_ids(self, query, offset, limit):
+        ids = self._queryset(query).values_list('pk', flat=True)
+        stop = offset + limit if limit is not None else None
+        return list(ids[offset:stop])
+
+    def search(self, query):
+        return SearchResults(self, query)
+
+
+class SqliteSearchBackend(SimpleSearchBackend):
+    """Полнотекстовый поиск через виртуальную таблицу SQLite FTS5"""
+
+    table = 'posts_post_fts'
+
+    @staticmethod
+    def match_expression(query):
+        # Каждое слово берется в кавычки, чтобы спецсимволы FTS5
+        # в запросе пользователя не ломали синтаксис MATCH.
+        return ' '.join(
+            '"{}"'.format(word.replace('"', '""')) for word in query.split()
+        )
+
+    def index(self, post_id, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id]
+            )
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, text) VALUES (%s, %s)',
+                [post_id, text],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post_id]
+            )
+
+    def index_queryset(self, queryset):
+        rows = list(queryset.values_list('pk', 'text'))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk, _ in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, text) VALUES (%s, %s)',
+                rows,
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}'
+            )
+
+    @property
+    def _matches(self):
+        # Виртуальная таблица не связана с posts_post внешним ключом:
+        # строки индекса без поста (например, после очистки таблицы
+        # постов) не учитываются ни в количестве, ни в выдаче.
+        return (
+            f'FROM {self.table} '
+            f'JOIN {Post._meta.db_table} post ON post.id = {self.table}.rowid '
+            f'WHERE {self.table} MATCH %s '
+        )
+
+    def count(self, query):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) {self._matches}',
+                [self.match_expression(query)],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, query, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {self.table}.rowid {self._matches}'
+                f'ORDER BY bm25({self.table}), {self.table}.rowid DESC '
+                f'LIMIT %s OFFSET %s',
+                [self.match_expression(query), -1 if limit is None else limit,
+                 offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    """Полнотекстовый поиск по tsvector с GIN-индексом в PostgreSQL"""
+
+    table = 'posts_post_search'
+
+    @property
+    def config(self):
+        return settings.POSTS_SEARCH_CONFIG
+
+    def index(self, post_id, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (post_id, document) '
+                f'VALUES (%s, to_tsvector(%s::regconfig, %s)) '
+                f'ON CONFLICT (post_id) DO UPDATE '
+                f'SET document = EXCLUDED.document',
+                [post_id, self.config, text],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE post_id = %s', [post_id]
+            )
+
+    def index_queryset(self, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (post_id, document) '
+                f'SELECT id, to_tsvector(%s::regconfig, text) '
+                f'FROM {Post._meta.db_table} WHERE id = ANY(%s) '
+                f'ON CONFLICT (post_id) DO UPDATE '
+                f'SET document = EXCLUDED.document',
+                [self.config, ids],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (post_id, document) '
+                f'SELECT id, to_tsvector(%s::regconfig, text) '
+                f'FROM {Post._meta.db_table}',
+                [self.config],
+            )
+
+    def count(self, query):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {self.table} '
+                f'WHERE document @@ plainto_tsquery(%s::regconfig, %s)',
+                [self.config, query],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, query, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id FROM {self.table}, '
+                f'plainto_tsquery(%s::regconfig, %s) query '
+                f'WHERE document @@ query '
+                f'ORDER BY ts_rank(document, query) DESC, post_id DESC '
+                f'LIMIT %s OFFSET %s',
+                [self.config, query, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def fts5_table_exists():
+    """Есть ли таблица FTS5 (ее нет, если SQLite собран без FTS5)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM sqlite_master WHERE name = %s',
+            [SqliteSearchBackend.table],
+        )
+        return cursor.fetchone() is not None
+
+
+_backend = None
+
+
+def get_backend():
+    """Поисковый бэкенд для текущей базы данных"""
+    global _backend
+    if _backend is None:
+        if connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite' and fts5_table_exists():
+            _backend = SqliteSearchBackend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
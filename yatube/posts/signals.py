@@ -0,0 +1,195 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from core.utils import invalidate_counts
+from . import authors, feed_cache, groups, tasks, timelines
+from .models import AuthorStats, Follow, Group, Post
+
+
+User = get_user_model()
+
+# Поля пользователя, которые выводятся в лентах рядом с постами.
+AUTHOR_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+def increment_post_count(sender, instance, created, **kwargs):
+    """Увеличивает счетчик публикаций автора при создании поста"""
+    if created:
+        AuthorStats.objects.change_post_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_post_count(sender, instance, **kwargs):
+    """Уменьшает счетчик публикаций автора при удалении поста"""
+    # Счетчик не создается: при удалении автора каскадом его счетчик
+    # может быть уже удален.
+    AuthorStats.objects.change_post_count(
+        instance.author_id, -1, create=False
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_counts(sender, **kwargs):
+    """Сбрасывает закэшированные количества постов для пагинатора"""
+    invalidate_counts(Post)
+
+
+@receiver(post_init, sender=User)
+def remember_author_names(sender, instance, **kwargs):
+    """
+    Запоминает имя пользователя на момент загрузки, чтобы при его
+    изменении сбросить ленты с его постами. Отложенные поля не читаются.
+    """
+    instance._loaded_names = tuple(
+        instance.__dict__.get(field) for field in AUTHOR_NAME_FIELDS
+    )
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=Group)
+def remember_loaded_values(sender, instance, **kwargs):
+    """
+    Запоминает группу поста и слаг группы на момент загрузки, чтобы при
+    их изменении сбросить кэш и старой ленты. Отложенные поля не читаются.
+    """
+    field = 'group_id' if sender is Post else 'slug'
+    instance._loaded_value = instance.__dict__.get(field)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    """Сбрасывает кэш главной ленты, ленты автора и лент групп поста"""
+    feed_cache.bump(feed_cache.INDEX)
+    feed_cache.bump(feed_cache.AUTHOR, instance.author.username)
+    # Слаги берутся из реестра групп; группы, которой еще нет в снимке,
+    # ищутся в БД. Удаленной группы нет и там, ее ленту сбрасывать не нужно.
+    group_ids = {instance.group_id, instance._loaded_value} - {None}
+    slugs = []
+    for group_id in group_ids:
+        group = groups.get_by_id(group_id)
+        if group is None:
+            slugs.extend(
+                Group.objects.using('default').filter(pk=group_id)
+                .values_list('slug', flat=True)
+            )
+        else:
+            slugs.append(group.slug)
+    if slugs:
+        feed_cache.bump(feed_cache.GROUP, *slugs)
+    instance._loaded_value = instance.group_id
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш ленты группы, главной ленты и лент авторов,
+    в которых выводятся посты группы.
+    """
+    feed_cache.bump(feed_cache.INDEX)
+    feed_cache.bump(feed_cache.GROUP, *{
+        instance.slug, instance._loaded_value
+    } - {None})
+    instance._loaded_value = instance.slug
+    usernames = (
+        Post.objects.filter(group_id=instance.pk)
+        .order_by()
+        .values_list('author__username', flat=True)
+        .distinct()
+    )
+    if usernames:
+        feed_cache.bump(feed_cache.AUTHOR, *usernames)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Ставит в очередь обновление текста поста в поисковом индексе"""
+    tasks.index_post.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Ставит в очередь удаление поста из поискового индекса"""
+    tasks.unindex_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_registry(sender, **kwargs):
+    """
+    Сбрасывает закэшированный реестр групп после фиксации транзакции,
+    чтобы новый снимок не был прочитан до появления изменений в БД.
+    """
+    transaction.on_commit(groups.invalidate)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_author_post_count(sender, instance, **kwargs):
+    """Сбрасывает запись автора: изменилось число его публикаций"""
+    authors.invalidate(instance.author_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает запись и ленту автора при изменении пользователя. Если
+    изменилось имя, сбрасываются и ленты, где выводятся его посты:
+    главная, ленты его групп и лента по старому username.
+    """
+    if update_fields and set(update_fields) <= {'last_login'}:
+        # Вход пользователя не меняет данных, выводимых в шаблонах.
+        return
+    loaded = instance._loaded_names
+    usernames = {instance.username, loaded[0]} - {None}
+    authors.invalidate(instance.pk, *usernames)
+    feed_cache.bump(feed_cache.AUTHOR, *usernames)
+    names = tuple(
+        instance.__dict__.get(field) for field in AUTHOR_NAME_FIELDS
+    )
+    if kwargs.get('created') is False and names != loaded:
+        feed_cache.bump(feed_cache.INDEX)
+        slugs = set(
+            Post.objects.filter(author=instance, group__isnull=False)
+            .values_list('group__slug', flat=True)
+        )
+        if slugs:
+            feed_cache.bump(feed_cache.GROUP, *slugs)
+    instance._loaded_names = names
+
+
+@receiver(post_save, sender=Follow)
+def increment_follower_count(sender, instance, created, **kwargs):
+    """Увеличивает счетчик подписчиков автора при подписке"""
+    if created:
+        AuthorStats.objects.change_follower_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_follower_count(sender, instance, **kwargs):
+    """Уменьшает счетчик подписчиков автора при отписке"""
+    AuthorStats.objects.change_follower_count(
+        instance.author_id, -1, create=False
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_timeline(sender, instance, **kwargs):
+    """Сбрасывает ленту подписок: изменился список авторов"""
+    timelines.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    """Ставит в очередь рассылку новой публикации подписчикам автора"""
+    if created:
+        tasks.fan_out_post.delay(instance.pk)
@@ -0,0 +1,39 @@
+from core.tasks import task
+from . import timelines
+from .models import Post
+from .search import get_backend
+
+
+@task
+def index_post(post_id):
+    """Обновляет текст поста в поисковом индексе"""
+    text = Post.objects.filter(pk=post_id).values_list(
+        'text', flat=True
+    ).first()
+    if text is not None:
+        get_backend().index(post_id, text)
+
+
+@task
+def unindex_post(post_id):
+    """Удаляет пост из поискового индекса"""
+    get_backend().remove(post_id)
+
+
+@task
+def fan_out_post(post_id):
+    """Дописывает публикацию в ленты подписчиков автора"""
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if post is not None:
+        timelines.fan_out(post)
+
+
+@task
+def fan_out_posts(post_ids):
+    """Дописывает публикации в ленты подписчиков их авторов"""
+    for post in Post.objects.filter(pk__in=post_ids).only(
+        'author_id', 'pub_date'
+    ):
+        timelines.fan_out(post)
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='User')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Текст {number}', author=cls.user, group=cls.group
+            )
+            for number in range(15)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds_paginated_by_cursor(self):
+        """Ленты API отдаются страницами по курсору без повторов"""
+        for url in (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:api_profile', kwargs={'username': 'User'}),
+        ):
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                second = self.client.get(first['next']).json()
+                self.assertEqual(len(first['results']), 10)
+                self.assertEqual(len(second['results']), 5)
+                self.assertIsNone(second['next'])
+                ids = [
+                    row['id']
+                    for row in first['results'] + second['results']
+                ]
+                self.assertEqual(
+                    ids, [post.pk for post in reversed(self.posts)]
+                )
+                self.assertEqual(first['results'][0]['author'], 'User')
+                self.assertEqual(first['results'][0]['group'], 'test-slug')
+
+    def test_sparse_fields(self):
+        """Параметр fields ограничивает поля ответа"""
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,text'}
+        )
+        self.assertEqual(
+            set(response.json()['results'][0]), {'id', 'text'}
+        )
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail(self):
+        """Публикация отдается по id, отсутствующая — с кодом 404"""
+        post = self.posts[0]
+        response = self.client.get(
+            reverse('posts:api_post_detail', kwargs={'post_id': post.pk}),
+            {'fields': 'text,author'},
+        )
+        self.assertEqual(
+            response.json(), {'text': post.text, 'author': 'User'}
+        )
+        for url in (
+            reverse('posts:api_post_detail', kwargs={'post_id': 10 ** 6}),
+            reverse('posts:api_group_list', kwargs={'slug': 'missing'}),
+            reverse('posts:api_profile', kwargs={'username': 'missing'}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_conditional_get(self):
+        """Повторный запрос с ETag получает 304 до изменения ленты"""
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Post.objects.create(text='Новая публикация', author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['results'][0]['text'], 'Новая публикация'
+        )
+
+    def test_rename_invalidates_cached_payloads(self):
+        """Смена username сбрасывает закэшированные ответы с автором"""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', kwargs={'slug': 'test-slug'}),
+            reverse(
+                'posts:api_post_detail', kwargs={'post_id': self.posts[0].pk}
+            ),
+        )
+        old_profile = reverse(
+            'posts:api_profile', kwargs={'username': 'User'}
+        )
+        for url in urls + (old_profile,):
+            self.client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'Renamed'
+        user.save()
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                row = data['results'][0] if 'results' in data else data
+                self.assertEqual(row['author'], 'Renamed')
+        self.assertEqual(self.client.get(old_profile).status_code, 404)
@@ -0,0 +1,186 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from posts import groups
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.other_user = User.objects.create(username='Other')
+        cls.group = Group.objects.create(
+            title='Название группы',
+            slug='test-slug',
+            description='Описание группы'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Описание группы'
+        )
+        cls.post = Post.objects.create(
+            text='Текст поста',
+            author=cls.user,
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_cached_until_post_changes(self):
+        """Закэшированные ленты обновляются после изменения поста"""
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'User'}),
+        )
+        for address in addresses:
+            self.guest_client.get(address)
+
+        Post.objects.filter(pk=self.post.pk).update(text='Скрытое изменение')
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertContains(response, 'Текст поста')
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertContains(response, 'Новый текст')
+
+    def test_unrelated_feeds_keep_cache(self):
+        """Пост другого автора и группы не сбрасывает чужие ленты"""
+        address = reverse('posts:profile', kwargs={'username': 'User'})
+        self.guest_client.get(address)
+        Post.objects.create(
+            text='Чужой пост', author=self.other_user, group=self.other_group
+        )
+        Post.objects.filter(pk=self.post.pk).update(text='Скрытое изменение')
+        response = self.guest_client.get(address)
+        self.assertContains(response, 'Текст поста')
+
+    def test_group_move_invalidates_old_group(self):
+        """Перенос поста в другую группу сбрасывает кэш обеих групп"""
+        address = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.guest_client.get(address)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.other_group
+        post.save()
+        response = self.guest_client.get(address)
+        self.assertNotContains(response, 'Текст поста')
+
+    def test_author_cache_follows_user_and_posts(self):
+        """Данные автора обновляются при изменении пользователя и постов"""
+        address = reverse('posts:profile', kwargs={'username': 'User'})
+        self.guest_client.get(address)
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        Post.objects.create(text='Еще пост', author=self.user)
+        response = self.guest_client.get(address)
+        self.assertEqual(response.context['author'].get_full_name(),
+                         'Новое Имя')
+        self.assertEqual(response.context['post_count'], 2)
+
+    def test_rename_invalidates_feeds_with_author_posts(self):
+        """Смена имени сбрасывает главную, ленты групп и старый профиль"""
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+        )
+        old_profile = reverse('posts:profile', kwargs={'username': 'User'})
+        for address in addresses + (old_profile,):
+            self.guest_client.get(address)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'Renamed'
+        user.first_name = 'Новое'
+        user.save()
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertContains(self.guest_client.get(address), 'Новое')
+        self.assertEqual(self.guest_client.get(old_profile).status_code, 404)
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.post = Post.objects.create(text='Текст поста', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_conditional_get_not_modified(self):
+        """Повторный запрос с If-None-Match получает 304"""
+        address = reverse('posts:index')
+        response = self.guest_client.get(address)
+        self.assertIn('ETag', response)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                address, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_feed(self):
+        """Новый пост меняет ETag ленты автора"""
+        address = reverse('posts:profile', kwargs={'username': 'User'})
+        etag = self.guest_client.get(address)['ETag']
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый пост')
+        self.assertIn('Last-Modified', response)
+
+    def test_etag_changes_after_cache_clear(self):
+        """После очистки кэша старый ETag не дает ответа 304"""
+        address = reverse('posts:index')
+        etag = self.guest_client.get(address)['ETag']
+        cache.clear()
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_params_not_cached(self):
+        """Страница с посторонними параметрами не кэшируется"""
+        address = reverse('posts:index')
+        self.assertIn('ETag', self.guest_client.get(address, {'page': 1}))
+        response = self.guest_client.get(
+            address, {'page': 1, 'utm_source': 'mail'}
+        )
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('ETag', self.guest_client.get(
+            address, {'page': [1, 2]}
+        ))
+
+    def test_authorized_not_cached(self):
+        """Авторизованному пользователю кэш страниц не отдается"""
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotIn('ETag', response)
+
+
+class GroupRegistryTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_registry_reset_after_commit(self):
+        """Реестр групп сбрасывается только после фиксации транзакции"""
+        self.assertEqual(groups.all_groups(), [])
+        with transaction.atomic():
+            group = Group.objects.create(title='Группа', slug='group')
+            self.assertIsNone(groups.get_by_slug('group'))
+        self.assertEqual(groups.get_by_slug('group').pk, group.pk)
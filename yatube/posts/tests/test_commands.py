@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+
+from posts import authors, timelines
+from posts.models import AuthorStats, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ImportMixin:
+    """Файл импорта с пятью корректными и двумя ошибочными строками"""
+
+    def write_rows(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'posts.jsonl')
+        rows = [
+            {'text': f'Импорт {num}', 'author': 'User', 'group': 'test-slug'}
+            for num in range(5)
+        ] + [
+            {'text': '', 'author': 'User'},
+            {'text': 'Без автора', 'author': 'Nobody'},
+        ]
+        with open(self.path, 'w') as source:
+            for row in rows:
+                source.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def import_posts(self, *args):
+        call_command(
+            'import_posts', self.path, *args,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+
+
+class ImportPostsTests(ImportMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.group = Group.objects.create(
+            title='Название группы',
+            slug='test-slug',
+            description='Описание группы'
+        )
+
+    def setUp(self):
+        self.write_rows()
+
+    def test_import_valid_rows(self):
+        """Загружаются только корректные строки, счетчики обновлены"""
+        self.import_posts('--batch-size', '2')
+        self.assertEqual(
+            Post.objects.filter(author=self.user, group=self.group).count(),
+            5,
+        )
+        self.assertEqual(AuthorStats.objects.post_count(self.user.pk), 5)
+
+    def test_non_object_rows_rejected(self):
+        """Строки JSON, которые не являются объектами, отклоняются"""
+        with open(self.path, 'a') as source:
+            source.write('42\n["Текст", "User"]\n')
+        stderr = StringIO()
+        call_command(
+            'import_posts', self.path, stdout=StringIO(), stderr=stderr
+        )
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertIn('Строка 8 отклонена', stderr.getvalue())
+        self.assertIn('Строка 9 отклонена', stderr.getvalue())
+
+    def test_import_resets_author_records(self):
+        """Закэшированная запись автора получает новое число постов"""
+        cache.clear()
+        self.assertEqual(authors.get_by_username('User').post_count, 0)
+        self.import_posts()
+        self.assertEqual(authors.get_by_username('User').post_count, 5)
+
+    def test_resume_skips_imported_rows(self):
+        """Повторный запуск с --resume не дублирует посты"""
+        self.import_posts()
+        self.import_posts('--resume')
+        self.assertEqual(Post.objects.count(), 5)
+
+
+# Рассылка в ленты выполняется после фиксации транзакции пачки.
+class ImportFanOutTests(ImportMixin, TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='User')
+        Group.objects.create(
+            title='Название группы',
+            slug='test-slug',
+            description='Описание группы'
+        )
+        self.follower = User.objects.create(username='Follower')
+        Follow.objects.create(user=self.follower, author=self.user)
+        self.write_rows()
+        cache.clear()
+
+    def test_import_fans_out_to_followers(self):
+        """Импортированные посты попадают в собранные ленты подписчиков"""
+        self.assertEqual(timelines.timeline(self.follower.pk), [])
+        self.import_posts('--batch-size', '2')
+        self.assertEqual(
+            [pk for _, pk in timelines.timeline(self.follower.pk)],
+            list(Post.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True)),
+        )
+
+
+class ExportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='User')
+        cls.staff = User.objects.create(username='Staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Название группы',
+            slug='test-slug',
+            description='Описание группы'
+        )
+        Post.objects.create(text='Пост в группе', author=cls.user,
+                            group=cls.group)
+        Post.objects.create(text='Пост без группы', author=cls.user)
+
+    def test_export_command_filters_by_group(self):
+        """Команда выгружает только посты выбранной группы"""
+        output = StringIO()
+        call_command('export_posts', '--group', 'test-slug', stdout=output)
+        records = [json.loads(line) for line in output.getvalue().split(
+            '\n'
+        ) if line]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['text'], 'Пост в группе')
+        self.assertEqual(records[0]['author'], 'User')
+        self.assertEqual(records[0]['group'], 'test-slug')
+
+    def test_export_view_staff_only(self):
+        """Выгрузка доступна только сотрудникам и отдается потоком"""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+        client.force_login(self.staff)
+        response = client.get(reverse('posts:export'), {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), 3)
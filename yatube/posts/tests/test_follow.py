@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    TestCase, TransactionTestCase, Client, override_settings
+)
+from django.urls import reverse
+
+from posts import timelines
+from posts.models import AuthorStats, Follow, Post
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def follow(self, username):
+        return self.client.post(
+            reverse('posts:profile_follow', kwargs={'username': username})
+        )
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка меняют подписки и счетчик подписчиков"""
+        self.follow('author')
+        self.follow('author')
+        self.follow('reader')
+        self.assertEqual(
+            list(Follow.objects.values_list('user', 'author')),
+            [(self.reader.pk, self.author.pk)],
+        )
+        self.assertEqual(
+            AuthorStats.objects.follower_count(self.author.pk), 1
+        )
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'author'})
+        )
+        self.assertTrue(response.context['following'])
+
+        self.client.post(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            AuthorStats.objects.follower_count(self.author.pk), 0
+        )
+
+    def test_follow_requires_post(self):
+        """Подписка не выполняется GET-запросом"""
+        response = self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_timeline_contains_followed_authors(self):
+        """В ленте подписок только публикации избранных авторов"""
+        followed = Post.objects.create(text='Избранный', author=self.author)
+        Post.objects.create(text='Чужой', author=self.stranger)
+        self.follow('author')
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [followed])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0, TIMELINE_LENGTH=2)
+    def test_popular_author_merged_on_read(self):
+        """Публикации популярных авторов добавляются при чтении ленты"""
+        self.follow('author')
+        self.follow('stranger')
+        Follow.objects.create(user=self.stranger, author=self.author)
+        self.assertEqual(timelines.timeline(self.reader.pk), [])
+        posts = [
+            Post.objects.create(text=f'Текст {number}', author=author)
+            for number, author in enumerate(
+                (self.author, self.stranger, self.author)
+            )
+        ]
+        self.assertEqual(
+            [pk for _, pk in timelines.timeline(self.reader.pk)],
+            [posts[2].pk, posts[1].pk],
+        )
+
+
+class FanOutTests(TransactionTestCase):
+    """Рассылка идет задачей после фиксации транзакции"""
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+
+    def test_new_post_fanned_out_to_cached_timeline(self):
+        """Новая публикация дописывается в собранную ленту подписчика"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(timelines.timeline(self.reader.pk), [])
+        post = Post.objects.create(text='Новая', author=self.author)
+        with self.assertNumQueries(1):
+            # Остается только запрос популярных авторов.
+            entries = timelines.timeline(self.reader.pk)
+        self.assertEqual(entries, [(post.pub_date, post.pk)])
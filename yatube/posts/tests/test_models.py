@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import AuthorStats, Group, Post
 
 User = get_user_model()
 
@@ -30,4 +33,31 @@ class PostModelTest(TestCase):
 
         task = PostModelTest.post
         expected_object_name = task.text[:15]
-        self.assertEqual(expected_object_name, str(task))
\ No newline at end of file
+        self.assertEqual(expected_object_name, str(task))
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        for _ in range(3):
+            Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def test_post_count_follows_create_and_delete(self):
+        """Счетчик меняется при создании и удалении поста"""
+        self.assertEqual(AuthorStats.objects.post_count(self.user.pk), 3)
+        Post.objects.filter(author=self.user).first().delete()
+        self.assertEqual(AuthorStats.objects.post_count(self.user.pk), 2)
+
+    def test_post_count_not_negative(self):
+        """Разошедшийся счетчик при удалении не уходит ниже нуля"""
+        AuthorStats.objects.filter(author=self.user).update(post_count=0)
+        Post.objects.filter(author=self.user).first().delete()
+        self.assertEqual(AuthorStats.objects.post_count(self.user.pk), 0)
+
+    def test_reconcile_repairs_drift(self):
+        """Пересчет исправляет рассинхронизированный счетчик"""
+        AuthorStats.objects.filter(author=self.user).update(post_count=10)
+        call_command('reconcile_post_counts', stdout=StringIO())
+        self.assertEqual(AuthorStats.objects.post_count(self.user.pk), 3)
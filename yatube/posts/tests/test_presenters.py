@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core.utils import paginate
+from posts.models import Group, Post
+from posts.presenters import FeedPage, url_for
+
+User = get_user_model()
+
+
+class FeedPresenterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='user.name+1@example', first_name='Имя',
+            last_name='Фамилия',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group
+        )
+        Post.objects.create(text='Без группы', author=cls.user)
+
+    def test_url_for_matches_reverse(self):
+        """Склеенные адреса совпадают с reverse"""
+        for name, value in (
+            ('posts:profile', self.user.username),
+            ('posts:profile', 'пользователь'),
+            ('posts:post_detail', self.post.pk),
+            ('posts:post_edit', self.post.pk),
+            ('posts:group_list', self.group.slug),
+        ):
+            with self.subTest(name=name, value=value):
+                self.assertEqual(
+                    url_for(name, value), reverse(name, args=[value])
+                )
+
+    def test_feed_page_is_lazy(self):
+        """Элементы строятся при первом обходе, а не при создании"""
+        page_obj = paginate(Post.objects.feed(), 1)
+        with self.assertNumQueries(0):
+            feed = FeedPage(page_obj)
+        with self.assertNumQueries(1):
+            items = list(feed)
+        grouped, ungrouped = sorted(items, key=lambda item: item.pk)
+        self.assertEqual(grouped.author_name, 'Имя Фамилия')
+        self.assertEqual(
+            grouped.detail_url,
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+        self.assertEqual(grouped.group_title, self.group.title)
+        self.assertEqual(ungrouped.group_url, '')
@@ -0,0 +1,180 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from posts.models import Post, Group
+
+User = get_user_model()
+
+
+class FeedQueriesTests(TestCase):
+    """Количество запросов к БД в лентах не зависит от числа постов"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='User',
+            first_name='Имя',
+            last_name='Фамилия',
+        )
+        cls.group = Group.objects.create(
+            title='Название группы',
+            slug='test-slug',
+            description='Описание группы'
+        )
+        for num_author in range(5):
+            author = User.objects.create(username=f'Author{num_author}')
+            group = Group.objects.create(
+                title=f'Группа {num_author}',
+                slug=f'slug-{num_author}',
+                description='Описание группы'
+            )
+            Post.objects.create(
+                text='Текст поста', author=author, group=group
+            )
+        for num_post in range(10):
+            cls.post = Post.objects.create(
+                text=f'Текст поста {num_post}',
+                author=cls.user,
+                group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feed_views_num_queries(self):
+        """Ленты выполняют постоянное число запросов"""
+        # Для главной ленты пагинатор при пустом кэше еще проверяет
+        # наличие статистики базы данных.
+        pages_queries = {
+            reverse('posts:index'): 3,
+            reverse('posts:index') + '?cursor=start': 1,
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}): 3,
+            reverse('posts:profile', kwargs={'username': 'User'}): 4,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 3,
+        }
+        for address, num_queries in pages_queries.items():
+            with self.subTest(address=address):
+                cache.clear()
+                with self.assertNumQueries(num_queries):
+                    response = self.guest_client.get(address)
+                self.assertEqual(response.status_code, 200)
+
+    def test_feed_views_cached(self):
+        """
+        Повторный запрос ленты берет общее число постов и
+        список постов из кэша
+        """
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        # Два запроса каждой страницы загружают сессию и пользователя.
+        pages_queries = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}): 2,
+            reverse('posts:profile', kwargs={'username': 'User'}): 2,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 3,
+            reverse('posts:post_create'): 2,
+        }
+        for address, num_queries in pages_queries.items():
+            with self.subTest(address=address):
+                authorized_client.get(address)
+                with self.assertNumQueries(num_queries):
+                    authorized_client.get(address)
+
+    def test_anonymous_pages_cached(self):
+        """Анонимный читатель получает страницу ленты без запросов к БД"""
+        for address in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'User'}),
+        ):
+            with self.subTest(address=address):
+                self.guest_client.get(address)
+                with self.assertNumQueries(0):
+                    self.guest_client.get(address)
+
+    def test_cached_count_invalidated_on_create(self):
+        """Новый пост сбрасывает закэшированное число постов"""
+        self.guest_client.get(reverse('posts:index'))
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 16)
+
+
+@override_settings(TASKS_EAGER=False)
+class WritePathQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='Writer')
+        cls.group = Group.objects.create(
+            title='Группа', slug='write-slug', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        # Первый запрос собирает реестр групп и счетчик автора.
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Первый пост', 'group': self.group.pk},
+        )
+
+    def test_create_post_queries(self):
+        """
+        Создание поста: сессия, пользователь, вставка поста и счетчик
+        автора (в точке сохранения); выбранная группа берется из реестра
+        и не проверяется моделью повторно
+        """
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse('posts:post_create'),
+                {'text': 'Новый пост', 'group': self.group.pk},
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_edit_post_queries(self):
+        """
+        Правка поста: сессия, пользователь, пост и обновление; группа
+        берется из реестра
+        """
+        post = Post.objects.get(text='Первый пост')
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                {'text': 'Исправленный пост', 'group': self.group.pk},
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_unknown_group_rejected_with_one_query(self):
+        """
+        Группы нет в реестре: она один раз ищется в БД и отклоняется,
+        варианты выбора на странице берутся из реестра
+        """
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse('posts:post_create'),
+                {'text': 'Новый пост', 'group': 10 ** 6},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('group', response.context['form'].errors)
+
+    def test_group_missing_from_registry_accepted(self):
+        """Группа, которой еще нет в снимке реестра, ищется в БД"""
+        # В TestCase транзакция не фиксируется, и реестр не сбрасывается.
+        group = Group.objects.create(
+            title='Новая группа', slug='new-slug', description='Описание'
+        )
+        response = self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост в новой группе', 'group': group.pk},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            Post.objects.filter(text='Пост в новой группе', group=group)
+            .exists()
+        )
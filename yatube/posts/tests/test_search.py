@@ -0,0 +1,74 @@
+from django.test import TransactionTestCase, Client
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import get_backend
+
+User = get_user_model()
+
+
+# Индекс обновляется задачами после фиксации транзакции, поэтому тесты
+# идут без общей транзакции TestCase.
+class SearchViewTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='User')
+        self.post = Post.objects.create(
+            text='Кошки любят молоко', author=self.user
+        )
+        Post.objects.create(text='Собаки любят кости', author=self.user)
+        for num_post in range(12):
+            Post.objects.create(
+                text=f'Заметка про погоду {num_post}', author=self.user
+            )
+        self.guest_client = Client()
+
+    def tearDown(self):
+        # Очистка базы после теста не затрагивает виртуальную таблицу
+        # индекса: индекс пересобирается по оставшимся постам.
+        get_backend().rebuild()
+
+    def search(self, query, page=1):
+        return self.guest_client.get(
+            reverse('posts:search'), {'q': query, 'page': page}
+        )
+
+    def test_search_finds_posts(self):
+        """Поиск находит посты по словам из текста"""
+        response = self.search('любят')
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        response = self.search('кошки молоко')
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.post.pk],
+        )
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении поста"""
+        self.post.text = 'Кошки любят рыбу'
+        self.post.save()
+        self.assertEqual(
+            len(self.search('молоко').context['page_obj']), 0
+        )
+        self.assertEqual(len(self.search('рыбу').context['page_obj']), 1)
+        self.post.delete()
+        self.assertEqual(len(self.search('рыбу').context['page_obj']), 0)
+
+    def test_search_paginated(self):
+        """Результаты поиска разбиты на страницы"""
+        self.assertEqual(len(self.search('погоду').context['page_obj']), 10)
+        self.assertEqual(
+            len(self.search('погоду', page=2).context['page_obj']), 2
+        )
+
+    def test_orphaned_index_rows_ignored(self):
+        """Строки индекса без поста не учитываются в результатах"""
+        get_backend().index(10 ** 6, 'Кошки любят сметану')
+        page = self.search('любят').context['page_obj']
+        self.assertEqual(page.paginator.count, 2)
+        self.assertEqual(len(page), 2)
+
+    def test_special_characters_in_query(self):
+        """Спецсимволы в запросе не приводят к ошибке"""
+        response = self.search('"кошки" OR (')
+        self.assertEqual(response.status_code, 200)
@@ -1,5 +1,6 @@
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 from posts.models import Post, Group
 
@@ -23,6 +24,9 @@ class StaticURLTests(TestCase):
         )
 
     def setUp(self):
+        # Реестр групп сбрасывается после фиксации транзакции, а в
+        # TestCase ее нет: очищаем кэш, чтобы увидеть группы класса
+        cache.clear()
         # Создаем неавторизованный клиент
         self.guest_client = Client()
         # Создаем авторизованый клиент
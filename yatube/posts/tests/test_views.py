@@ -1,5 +1,6 @@
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from django import forms
 
@@ -28,6 +29,9 @@ class StaticViewTests(TestCase):
         )      
 
     def setUp(self):
+        # Реестр групп сбрасывается после фиксации транзакции, а в
+        # TestCase ее нет: очищаем кэш, чтобы увидеть группы класса
+        cache.clear()
         # Создаем неавторизованный клиент
         self.guest_client = Client()
         # Создаем авторизованый клиент
@@ -208,6 +212,9 @@ class PaginatorViewTests(TestCase):
             ) 
     
     def setUp(self):
+        # Реестр групп сбрасывается после фиксации транзакции, а в
+        # TestCase ее нет: очищаем кэш, чтобы увидеть группы класса
+        cache.clear()
         # Создаем неавторизованный клиент
         self.guest_client = Client()
         # Создаем авторизованый клиент
@@ -260,4 +267,42 @@ class PaginatorViewTests(TestCase):
             )
             + '?page=2'
         )
-        self.assertEqual(len(response.context['page_obj']), 5)
\ No newline at end of file
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_index_cursor_pages(self):
+        """Курсор ведет на следующую и обратно на предыдущую страницу"""
+        response = self.guest_client.get(
+            reverse('posts:index') + '?cursor=start'
+        )
+        first_page = response.context['page_obj']
+        self.assertEqual(len(first_page), 10)
+        self.assertFalse(first_page.has_previous())
+
+        response = self.guest_client.get(
+            reverse('posts:index') + f'?cursor={first_page.next_cursor}'
+        )
+        second_page = response.context['page_obj']
+        self.assertEqual(len(second_page), 5)
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(second_page[0].text, 'Текст поста 5')
+
+        response = self.guest_client.get(
+            reverse('posts:index')
+            + f'?cursor={second_page.previous_cursor}'
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in first_page],
+        )
+
+    def test_cursor_first_page_link(self):
+        """Ссылка «Первая» ведет на первую страницу того же вывода"""
+        first_page = self.guest_client.get(
+            reverse('posts:index') + '?cursor='
+        ).context['page_obj']
+        self.assertTrue(first_page.is_cursor)
+        response = self.guest_client.get(
+            reverse('posts:index') + f'?cursor={first_page.next_cursor}'
+        )
+        self.assertContains(response, 'href="?cursor="')
+        self.assertNotContains(response, 'page=1')
@@ -0,0 +1,121 @@
+"""
+Ленты подписок пользователей.
+
+Лента хранится в кэше как список (pub_date, id) последних
+TIMELINE_LENGTH публикаций авторов, на которых подписан пользователь.
+Новая публикация дописывается в уже собранные ленты подписчиков
+(fan-out-on-write). Публикации авторов, у которых больше
+TIMELINE_FANOUT_LIMIT подписчиков, не рассылаются, а добавляются при
+чтении ленты (fan-out-on-read). Отсутствующая в кэше лента собирается
+из базы при первом чтении.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AuthorStats, Follow, Post
+
+
+FANOUT_BATCH_SIZE = 1000
+
+
+def _timeline_key(user_id):
+    return f'timeline:{user_id}'
+
+
+def _following_key(user_id):
+    return f'following:{user_id}'
+
+
+def following_ids(user_id):
+    """id авторов, на которых подписан пользователь"""
+    key = _following_key(user_id)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = list(Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        ))
+        cache.set(key, author_ids, settings.TIMELINE_CACHE_TIMEOUT)
+    return author_ids
+
+
+def _recent(author_ids):
+    """Последние публикации авторов в виде списка (pub_date, id)"""
+    return list(
+        Post.objects.filter(author_id__in=author_ids)
+        .order_by('-pub_date', '-pk')
+        .values_list('pub_date', 'pk')[:settings.TIMELINE_LENGTH]
+    )
+
+
+def _push(entries, entry):
+    """Вставляет запись в ленту по убыванию (pub_date, id) и обрезает ее"""
+    if entry not in entries:
+        position = next(
+            (index for index, existing in enumerate(entries)
+             if existing < entry),
+            len(entries),
+        )
+        entries.insert(position, entry)
+        del entries[settings.TIMELINE_LENGTH:]
+    return entries
+
+
+def fan_out(post):
+    """Дописывает публикацию в собранные ленты подписчиков автора"""
+    if AuthorStats.objects.follower_count(post.author_id) > (
+        settings.TIMELINE_FANOUT_LIMIT
+    ):
+        return
+    entry = (post.pub_date, post.pk)
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True).iterator()
+    batch = []
+    for follower_id in follower_ids:
+        batch.append(_timeline_key(follower_id))
+        if len(batch) == FANOUT_BATCH_SIZE:
+            _fan_out_batch(batch, entry)
+            batch = []
+    if batch:
+        _fan_out_batch(batch, entry)
+
+
+def _fan_out_batch(keys, entry):
+    # Ленты, которых нет в кэше, соберутся из базы при чтении
+    # и уже будут содержать новую публикацию.
+    timelines = cache.get_many(keys)
+    cache.set_many(
+        {key: _push(entries, entry) for key, entries in timelines.items()},
+        settings.TIMELINE_CACHE_TIMEOUT,
+    )
+
+
+def timeline(user_id):
+    """Лента подписок пользователя: список (pub_date, id), новые первыми"""
+    author_ids = following_ids(user_id)
+    if not author_ids:
+        return []
+    popular = set(AuthorStats.objects.filter(
+        author_id__in=author_ids,
+        follower_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('author_id', flat=True))
+
+    key = _timeline_key(user_id)
+    entries = cache.get(key)
+    if entries is None:
+        entries = _recent(
+            [author_id for author_id in author_ids if author_id not in popular]
+        )
+        cache.set(key, entries, settings.TIMELINE_CACHE_TIMEOUT)
+    if popular:
+        # Автор мог стать популярным после рассылки части публикаций,
+        # поэтому повторы отбрасываются.
+        entries = sorted(
+            set(entries).union(_recent(popular)), reverse=True
+        )[:settings.TIMELINE_LENGTH]
+    return entries
+
+
+def invalidate(user_id):
+    """Сбрасывает ленту и подписки пользователя"""
+    cache.delete_many((_timeline_key(user_id), _following_key(user_id)))
@@ -1,55 +1,163 @@
+from urllib.parse import urlencode
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-
-from .models import Post, Group
-from .forms import PostForm
+from django.views.decorators.http import require_POST
+
+from . import authors, feed_cache, groups, timelines
+from .models import Follow, Post
+from .export import CONTENT_TYPES, export_lines, export_queryset
+from .forms import ExportFilterForm, PostForm
+from .presenters import FeedPage
+from .search import get_backend
+from core.db_router import use_primary
+from core.parallel import run_parallel
 from core.utils import paginate
 
 
 User = get_user_model()
 
 
+# Ленты кэшируются по версии, которая меняется сразу после записи:
+# страница, собранная по отстающей реплике, осталась бы в кэше под
+# новой версией. Поэтому ленты читаются с основной базы.
+@use_primary
 def index(request):
     """Вью для отображения главной страницы с публикациями"""
     template: str = 'posts/index.html'
-    post_list = Post.objects.all()
+    post_list = Post.objects.feed()
     page_number = request.GET.get('page')
-    page_obj = paginate(post_list, page_number)
+    page_obj = paginate(
+        post_list, page_number, cursor=request.GET.get('cursor')
+    )
 
     context: dict = {
         'page_obj': page_obj,
+        'feed': FeedPage(page_obj),
+        **feed_cache.feed_cache_context(request, page_obj, feed_cache.INDEX),
     }
     return render(request, template, context)
 
 
+@use_primary
 def group_posts(request, slug):
     """Вью для отображения страниц с постами конкретной группы"""
     template: str = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    post_list = Post.objects.filter(group=group)
+    post_list = Post.objects.feed().filter(group__slug=slug)
     page_number = request.GET.get('page')
-    page_obj = paginate(post_list, page_number)
+    # Страница ленты не зависит от поиска группы: при VIEW_QUERY_WORKERS
+    # их запросы выполняются одновременно.
+    page_obj, group = run_parallel(
+        lambda: paginate(
+            post_list, page_number, cursor=request.GET.get('cursor')
+        ),
+        lambda: groups.get_by_slug(slug),
+    )
+    if group is None:
+        raise Http404('Группа не найдена')
 
     context: dict = {
         'group': group,
         'page_obj': page_obj,
+        'feed': FeedPage(page_obj),
+        **feed_cache.feed_cache_context(
+            request, page_obj, feed_cache.GROUP, group.slug
+        ),
     }
     return render(request, template, context)
 
 
+@use_primary
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author)
-    post_count = post_list.count()
+    post_list = Post.objects.feed().filter(author__username=username)
     page_number = request.GET.get('page')
-    page_obj = paginate(post_list, page_number)
+    page_obj, author = run_parallel(
+        lambda: paginate(
+            post_list, page_number, cursor=request.GET.get('cursor')
+        ),
+        lambda: authors.get_by_username(username),
+    )
+    if author is None:
+        raise Http404('Автор не найден')
 
+    user = request.user
+    following = user.is_authenticated and author.id in (
+        timelines.following_ids(user.pk)
+    )
     context = {
         'author': author,
         'page_obj': page_obj,
-        'post_count': post_count,
+        'feed': FeedPage(page_obj),
+        'post_count': author.post_count,
+        'following': following,
+        **feed_cache.feed_cache_context(
+            request, page_obj, feed_cache.AUTHOR, author.username
+        ),
+    }
+    return render(request, template, context)
+
+
+@login_required
+def follow_index(request):
+    """Вью ленты публикаций авторов, на которых подписан пользователь"""
+    template = 'posts/follow.html'
+    page_obj = paginate(
+        timelines.timeline(request.user.pk), request.GET.get('page')
+    )
+    posts = Post.objects.feed().in_bulk(
+        [pk for _, pk in page_obj.object_list]
+    )
+    # Удаленные после попадания в ленту публикации пропускаются.
+    page_obj.object_list = [
+        posts[pk] for _, pk in page_obj.object_list if pk in posts
+    ]
+    context = {
+        'page_obj': page_obj,
+        'feed': FeedPage(page_obj),
+    }
+    return render(request, template, context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    """Подписка на автора"""
+    author = authors.get_by_username(username)
+    if author is None:
+        raise Http404('Автор не найден')
+    if author.id != request.user.pk:
+        Follow.objects.get_or_create(user=request.user, author_id=author.id)
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    """Отписка от автора"""
+    Follow.objects.filter(
+        user=request.user, author__username=username
+    ).delete()
+    return redirect('posts:profile', username)
+
+
+def search(request):
+    """Вью полнотекстового поиска по публикациям"""
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = paginate(
+            get_backend().search(query), request.GET.get('page')
+        )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'feed': FeedPage(page_obj) if page_obj else None,
+        'page_params': urlencode({'q': query}) + '&',
     }
     return render(request, template, context)
 
@@ -57,49 +165,68 @@ def profile(request, username):
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
     user = request.user
-    post = get_object_or_404(Post, pk=post_id)
-    author = post.author
-    post_count = Post.objects.filter(author=author).count()
+    post = get_object_or_404(
+        Post.objects.select_related('group'), pk=post_id
+    )
+    author = authors.get_by_id(post.author_id)
     context = {
         'user': user,
         'post': post,
-        'post_count': post_count
+        'author': author,
+        'post_count': author.post_count,
     }
     return render(request, template, context)
 
 
 @login_required
+@use_primary
 def post_create(request):
     form = PostForm(request.POST or None)
-    group = Group.objects.all()
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
-        return redirect(f'/profile/{post.author}/', {
-            'form': form,
-        })
+        return redirect('posts:profile', request.user.username)
     return render(request, 'posts/create_post.html', {
         'form': form,
-        'group': group,
+        'group': groups.all_groups(),
     })
 
 
 @login_required
+@use_primary
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    group = Group.objects.all()
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
+        return redirect('posts:post_detail', post_id)
+    # Автор — текущий пользователь: сигналы не загрузят его повторно.
+    post.author = request.user
+    form = PostForm(request.POST or None, instance=post)
+    if form.is_valid():
+        form.save()
         return redirect('posts:post_detail', post_id)
-    form = PostForm(request.POST, instance=post)
-    is_edit = True
     context = {
         'form': form,
-        'is_edit': is_edit,
+        'is_edit': True,
         'post': post,
-        'group': group,
+        'group': groups.all_groups(),
     }
-    if form.is_valid():
-        form.save()
-        return redirect('posts:post_detail', post_id)
     return render(request, 'posts/create_post.html', context)
+
+
+@staff_member_required
+def export_posts(request):
+    """Потоковая выгрузка публикаций для сотрудников"""
+    form = ExportFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    filters = form.cleaned_data
+    file_format = filters.pop('format') or 'jsonl'
+    response = StreamingHttpResponse(
+        export_lines(export_queryset(**filters), file_format),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{file_format}"'
+    )
+    return response
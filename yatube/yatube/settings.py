@@ -21,17 +21,17 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = '_aofly*@u2j2flev=)c9nd0y^%6btxb2la(r(3a6cefu6ujxbb'
+SECRET_KEY = os.getenv(
+    'SECRET_KEY', '_aofly*@u2j2flev=)c9nd0y^%6btxb2la(r(3a6cefu6ujxbb'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', '1').lower() in ('1', 'true', 'yes', 'on')
 
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-    '[::1]',
-    'testserver',
-]
+# Список хостов через запятую, например ALLOWED_HOSTS=example.com,.example.org
+ALLOWED_HOSTS = os.getenv(
+    'ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1],testserver'
+).split(',')
 
 
 # Application definition
@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,13 +59,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.AnonymousFeedCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -91,6 +94,40 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения. Для локальной проверки подойдут копии db.sqlite3:
+# DATABASE_REPLICAS=/tmp/replica1.sqlite3,/tmp/replica2.sqlite3
+REPLICA_DATABASES = []
+for number, replica in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Максимальное отставание реплики, при котором с нее читают, секунды
+REPLICA_MAX_LAG = 5
+# Как часто проверять отставание реплик, секунды
+REPLICA_LAG_CHECK_INTERVAL = 5
+# Сколько секунд после изменения клиент читает с основной базы
+REPLICA_PIN_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Для нескольких процессов на одном сервере подходит
+# core.cache_backends.InstrumentedFileBasedCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache_backends.InstrumentedLocMemCache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -134,7 +171,59 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-#  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# письма складываются в очередь и отправляются командой send_spooled_mail
+EMAIL_BACKEND = 'core.mail.SpoolEmailBackend'
+#  подключаем движок filebased.EmailBackend для доставки из очереди
+MAIL_SPOOL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Время жизни закэшированного количества объектов в пагинаторе, секунды
+PAGINATOR_COUNT_TIMEOUT = 60
+# С какого размера таблицы пагинатор берет оценку из статистики БД
+PAGINATOR_ESTIMATE_THRESHOLD = 100000
+# Время жизни закэшированных фрагментов лент, секунды
+FEED_CACHE_TIMEOUT = 300
+# Время жизни закэшированных страниц лент для анонимных читателей, секунды
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 300
+# Конфигурация полнотекстового поиска PostgreSQL
+POSTS_SEARCH_CONFIG = 'russian'
+# Сколько последних запросов на каждый URL хранит статистика производительности
+PERF_STATS_WINDOW = 1000
+# Потоков для одновременных независимых запросов вью (0 - по очереди)
+VIEW_QUERY_WORKERS = int(os.getenv('VIEW_QUERY_WORKERS', '0'))
+# Отдавать заголовок Server-Timing всем, а не только сотрудникам и при DEBUG
+SERVER_TIMING = False
+# Порог журнала медленных запросов, мс (None отключает журнал)
+SLOW_QUERY_THRESHOLD_MS = 100
+# Время жизни закэшированных записей авторов, секунды
+AUTHOR_CACHE_TIMEOUT = 600
+# Время жизни закэшированного снимка групп, секунды
+GROUPS_CACHE_TIMEOUT = 600
+# PRAGMA, которые выполняются при открытии соединения с SQLite
+SQLITE_PRAGMAS = {}
+# Загружать все шаблоны при старте приложения
+TEMPLATE_WARMUP = False
+# Сколько последних публикаций хранит лента подписок пользователя
+TIMELINE_LENGTH = 500
+# Публикации авторов с большим числом подписчиков добавляются в ленты
+# при чтении, а не рассылаются при записи
+TIMELINE_FANOUT_LIMIT = 10000
+# Время жизни лент подписок в кэше, секунды
+TIMELINE_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+# Выполнять фоновые задачи сразу, без очереди и run_tasks
+TASKS_EAGER = os.getenv('TASKS_EAGER', '1').lower() in (
+    '1', 'true', 'yes', 'on'
+)
+# Число попыток выполнить фоновую задачу
+TASKS_MAX_ATTEMPTS = 5
+# Задержка перед первым повтором задачи, секунды; далее удваивается
+TASKS_RETRY_DELAY = 10
+# Через сколько секунд задача зависшего обработчика выдается снова
+TASKS_LOCK_TIMEOUT = 300
+# Сколько писем в секунду отправляет send_spooled_mail (0 — без ограничения)
+MAIL_SPOOL_RATE = 10
+# Число попыток отправить письмо
+MAIL_SPOOL_MAX_ATTEMPTS = 5
+# Задержка перед первым повтором отправки письма, секунды; далее удваивается
+MAIL_SPOOL_RETRY_DELAY = 60
@@ -0,0 +1,79 @@
+"""
+Настройки для боевого окружения.
+
+Запуск: DJANGO_SETTINGS_MODULE=yatube.settings_prod
+Обязательные переменные окружения: SECRET_KEY, ALLOWED_HOSTS.
+"""
+
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from core.sqlite import PRODUCTION_PRAGMAS
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+# Базовые настройки не меняются: их словари копируются.
+DATABASES = deepcopy(DATABASES)
+TEMPLATES = deepcopy(TEMPLATES)
+
+DEBUG = os.getenv('DEBUG', '0').lower() in ('1', 'true', 'yes', 'on')
+
+for variable in ('SECRET_KEY', 'ALLOWED_HOSTS'):
+    if not os.getenv(variable):
+        raise ImproperlyConfigured(
+            f'Не задана переменная окружения {variable}'
+        )
+
+# PostgreSQL вместо SQLite, если задана переменная POSTGRES_DB.
+# Драйвер ставится отдельно: pip install -r requirements-postgres.txt
+if os.getenv('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+    }
+
+# Соединения с БД переиспользуются между запросами, секунды
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 60
+
+SQLITE_PRAGMAS = PRODUCTION_PRAGMAS
+
+# Кэш общий для всех процессов: версии лент и реестра групп,
+# сброшенные в одном процессе, видны остальным.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache_backends.InstrumentedFileBasedCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+}
+
+# Скомпилированные шаблоны хранятся в памяти процесса.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', '1').lower() in (
+    '1', 'true', 'yes', 'on'
+)
+
+# Независимые запросы вью (страница, число объектов, автор или группа)
+# выполняются одновременно в пуле потоков.
+VIEW_QUERY_WORKERS = int(os.getenv('VIEW_QUERY_WORKERS', '4'))
+
+# Побочные действия сохранения выполняет run_tasks, а не запрос.
+TASKS_EAGER = os.getenv('TASKS_EAGER', '0').lower() in (
+    '1', 'true', 'yes', 'on'
+)
@@ -0,0 +1,20 @@
+"""
+Настройки для тестов.
+
+python manage.py test подключает их сам; вторая база SQLite нужна
+для проверки чтений с реплики в core.tests.test_db_router.
+"""
+
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DATABASES = deepcopy(DATABASES)
+
+# Раннер создает ее тестовую копию и, так как в REPLICA_DATABASES ее нет,
+# схему в ней. Тесты включают ее в REPLICA_DATABASES сами.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': ':memory:',
+}
@@ -6,6 +6,7 @@ urlpatterns = [
     path('', include('posts.urls')),
     path('about/', include('about.urls', namespace='about')),
     path('admin/', admin.site.urls),
+    path('perf/', include('core.urls', namespace='core')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
 ]